@@ -69,10 +69,10 @@ def dashboard():
         click.echo()
         click.secho("💰 Cost Status:", fg='yellow', bold=True)
         cost_table = [
-            ['Daily Cost', f"${cost_status['current_day']['cost']:.2f}"],
-            ['Daily Budget', f"${cost_status['current_day']['cost_limit']:.2f}"],
-            ['Budget Used', f"{cost_status['current_day']['percentage']:.1f}%"],
-            ['Status', cost_status['status'].upper()]
+            ['Daily Cost', f"${cost_status.day_cost:.2f}"],
+            ['Daily Budget', f"${cost_status.day_cost_limit:.2f}"],
+            ['Budget Used', f"{cost_status.day_percentage:.1f}%"],
+            ['Status', cost_status.status.upper()]
         ]
         click.echo(tabulate(cost_table, headers=['Metric', 'Value'], tablefmt='simple'))
         
@@ -110,12 +110,19 @@ def daily(send_email, format):
         
         click.secho("📊 Generating daily report...", fg='yellow')
         
-        # Generate and save report
-        json_path, html_path = generator.generate_and_save_daily_report(send_email=send_email)
-        
+        # Generate and save report in the requested format(s); skipping
+        # HTML also skips the template render entirely
+        json_path, html_path = generator.generate_and_save_daily_report(
+            send_email=send_email,
+            save_json=format in ('json', 'both'),
+            save_html=format in ('html', 'both')
+        )
+
         click.secho(f"✅ Report saved:", fg='green')
-        click.echo(f"   JSON: {json_path}")
-        click.echo(f"   HTML: {html_path}")
+        if json_path:
+            click.echo(f"   JSON: {json_path}")
+        if html_path:
+            click.echo(f"   HTML: {html_path}")
         
         if send_email:
             if generator.email_sender.enabled:
@@ -323,10 +330,10 @@ def status():
             'exceeded': 'red'
         }
         
-        click.secho(f"Status: {status['status'].upper()}", 
-                   fg=status_colors.get(status['status'], 'white'), bold=True)
-        
-        if status['emergency_stop']:
+        click.secho(f"Status: {status.status.upper()}",
+                   fg=status_colors.get(status.status, 'white'), bold=True)
+
+        if status.emergency_stop:
             click.secho("⛔ EMERGENCY STOP ACTIVE", fg='red', bold=True, blink=True)
         
         click.echo()
@@ -334,10 +341,10 @@ def status():
         # Daily metrics
         click.secho("Today:", fg='yellow')
         daily_table = [
-            ['Queries', f"{status['current_day']['queries']}/{status['current_day']['query_limit']}"],
-            ['Cost', f"${status['current_day']['cost']:.2f}/${status['current_day']['cost_limit']:.2f}"],
-            ['Budget Used', f"{status['current_day']['percentage']:.1f}%"],
-            ['Remaining', f"${status['current_day']['remaining']:.2f}"]
+            ['Queries', f"{status.day_queries}/{status.day_query_limit}"],
+            ['Cost', f"${status.day_cost:.2f}/${status.day_cost_limit:.2f}"],
+            ['Budget Used', f"{status.day_percentage:.1f}%"],
+            ['Remaining', f"${status.day_remaining:.2f}"]
         ]
         click.echo(tabulate(daily_table, tablefmt='simple'))
         
@@ -346,9 +353,9 @@ def status():
         # Monthly metrics
         click.secho("This Month:", fg='yellow')
         monthly_table = [
-            ['Cost', f"${status['current_month']['cost']:.2f}/${status['current_month']['limit']:.2f}"],
-            ['Budget Used', f"{status['current_month']['percentage']:.1f}%"],
-            ['Remaining', f"${status['current_month']['remaining']:.2f}"]
+            ['Cost', f"${status.month_cost:.2f}/${status.month_limit:.2f}"],
+            ['Budget Used', f"{status.month_percentage:.1f}%"],
+            ['Remaining', f"${status.month_remaining:.2f}"]
         ]
         click.echo(tabulate(monthly_table, tablefmt='simple'))
         
@@ -433,11 +440,11 @@ def check():
         
         # Check costs
         cost_status = monitor.get_cost_status()
-        if cost_status['status'] in ['critical', 'exceeded']:
+        if cost_status.status in ['critical', 'exceeded']:
             alerts_found.append({
                 'type': 'COST',
                 'severity': 'CRITICAL',
-                'message': f"Cost status: {cost_status['status'].upper()}"
+                'message': f"Cost status: {cost_status.status.upper()}"
             })
         
         # Display alerts
@@ -64,8 +64,7 @@ def check_environment():
         'google-analytics-data',
         'google-cloud-bigquery',
         'sendgrid',
-        'click',
-        'pytz'
+        'click'
     ]
     
     import importlib
@@ -0,0 +1,48 @@
+"""
+Manual test harness for the cost monitor
+
+Kept out of cost_monitor.py so importing the module doesn't carry the
+harness bytecode. Run directly: python src/_cost_monitor_selftest.py
+"""
+
+import json
+
+from cost_monitor import CostMonitor
+
+
+def main():
+    monitor = CostMonitor()
+
+    print("\n💰 Testing Cost Monitor...")
+    print("-" * 50)
+
+    # Test query cost checking
+    print("\n📊 Query Cost Checks:")
+
+    # Small query
+    small_query = monitor.check_query_cost(10_000_000)  # 10MB
+    print(f"10MB query: {small_query}")
+
+    # Large query
+    large_query = monitor.check_query_cost(500_000_000_000)  # 500GB
+    print(f"500GB query: {large_query}")
+
+    # Update some usage
+    monitor.update_usage(10_000_000, 0.00005)
+    monitor.update_usage(20_000_000, 0.00010)
+
+    # Get status
+    print("\n📈 Cost Status:")
+    status = monitor.get_cost_status()
+    print(json.dumps(status.to_dict(), indent=2))
+
+    # Get report
+    print("\n📋 Cost Report:")
+    report = monitor.generate_cost_report()
+    print(json.dumps(report, indent=2))
+
+    print("\n✅ Cost Monitor test complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,10 @@ BigQuery Manager Module (Batch Version)
 Uses batch loading instead of streaming for free tier compatibility
 """
 
+import io
 import os
 import json
-import tempfile
+import orjson
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from google.cloud import bigquery
@@ -105,6 +106,10 @@ class BigQueryManager:
                 bigquery.SchemaField('message', 'STRING'),
                 bigquery.SchemaField('details', 'STRING'),
                 bigquery.SchemaField('resolved', 'BOOLEAN'),
+            ],
+            'sync_checkpoints': [
+                bigquery.SchemaField('name', 'STRING', mode='REQUIRED'),
+                bigquery.SchemaField('last_ts', 'TIMESTAMP', mode='REQUIRED'),
             ]
         }
         
@@ -135,15 +140,17 @@ class BigQueryManager:
         """
         if not rows:
             return True
-        
+
         table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
-        
-        # Write to temporary JSONL file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.jsonl', delete=False) as f:
-            for row in rows:
-                f.write(json.dumps(row) + '\n')
-            temp_file = f.name
-        
+
+        # Build the JSONL payload in memory - the hourly sync sends small
+        # batches, so a temp-file round-trip through disk was pure overhead
+        buffer = io.BytesIO()
+        for row in rows:
+            buffer.write(orjson.dumps(row))
+            buffer.write(b'\n')
+        buffer.seek(0)
+
         try:
             # Configure load job
             job_config = bigquery.LoadJobConfig(
@@ -151,26 +158,21 @@ class BigQueryManager:
                 write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
                 autodetect=False  # Use existing schema
             )
-            
-            # Load from file
-            with open(temp_file, 'rb') as f:
-                load_job = self.client.load_table_from_file(
-                    f, table_id, job_config=job_config
-                )
-            
+
+            # Load from the in-memory buffer
+            load_job = self.client.load_table_from_file(
+                buffer, table_id, job_config=job_config
+            )
+
             # Wait for job to complete
             load_job.result()
-            
+
             print(f"✅ Batch loaded {len(rows)} rows to {table_name}")
             return True
-            
+
         except Exception as e:
             print(f"❌ Error batch loading to {table_name}: {e}")
             return False
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
     
     def insert_daily_metrics(self, metrics: Dict) -> bool:
         """Insert daily metrics using batch loading"""
@@ -297,6 +299,46 @@ class BigQueryManager:
         
         return results
     
+    def get_last_sync_ts(self, sync_name: str) -> Optional[datetime]:
+        """
+        Get the last checkpoint timestamp for a named sync
+
+        Args:
+            sync_name: Checkpoint name (e.g. 'hourly_daily_metrics')
+
+        Returns:
+            Last sync timestamp, or None if no checkpoint exists
+        """
+        query = f"""
+        SELECT MAX(last_ts) as last_ts
+        FROM `{self.project_id}.{self.dataset_id}.sync_checkpoints`
+        WHERE name = @sync_name
+        """
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter('sync_name', 'STRING', sync_name)
+            ]
+        )
+
+        try:
+            rows = list(self.client.query(query, job_config=job_config))
+            if rows and rows[0].last_ts:
+                return rows[0].last_ts
+        except Exception as e:
+            print(f"⚠️  Could not read sync checkpoint {sync_name}: {e}")
+
+        return None
+
+    def update_sync_checkpoint(self, sync_name: str) -> bool:
+        """Record a successful sync for the named checkpoint"""
+        row = {
+            'name': sync_name,
+            'last_ts': datetime.now().isoformat()
+        }
+
+        return self._batch_load_json('sync_checkpoints', [row])
+
     def log_alert(self, alert_type: str, severity: str, message: str, details: Dict = None) -> bool:
         """Log an alert using batch loading"""
         row = {
@@ -4,14 +4,10 @@ Tracks and controls Google Cloud costs
 """
 
 import os
-import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, NamedTuple
 from dataclasses import dataclass
 from enum import Enum
-from dotenv import load_dotenv
-
-load_dotenv()
 
 
 class AlertSeverity(Enum):
@@ -45,6 +41,51 @@ class CostThresholds:
     queries_per_day_limit: int = 1000
 
 
+class CostStatusView(NamedTuple):
+    """Flat snapshot of current cost status (single allocation per call)"""
+    status: str
+    emergency_stop: bool
+    hour_queries: int
+    hour_query_limit: int
+    day_queries: int
+    day_query_limit: int
+    day_cost: float
+    day_cost_limit: float
+    day_percentage: float
+    day_remaining: float
+    month_cost: float
+    month_limit: float
+    month_percentage: float
+    month_remaining: float
+    timestamp: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Expand to the nested dict shape used for JSON serialization"""
+        return {
+            'status': self.status,
+            'emergency_stop': self.emergency_stop,
+            'current_hour': {
+                'queries': self.hour_queries,
+                'limit': self.hour_query_limit
+            },
+            'current_day': {
+                'queries': self.day_queries,
+                'query_limit': self.day_query_limit,
+                'cost': self.day_cost,
+                'cost_limit': self.day_cost_limit,
+                'percentage': self.day_percentage,
+                'remaining': self.day_remaining
+            },
+            'current_month': {
+                'cost': self.month_cost,
+                'limit': self.month_limit,
+                'percentage': self.month_percentage,
+                'remaining': self.month_remaining
+            },
+            'timestamp': self.timestamp
+        }
+
+
 class CostMonitor:
     """Monitors and controls BigQuery costs"""
     
@@ -189,17 +230,28 @@ class CostMonitor:
         if alert['severity'] in [AlertSeverity.CRITICAL, AlertSeverity.EMERGENCY]:
             print("⛔ EMERGENCY: Pipeline operations suspended")
     
-    def get_cost_status(self) -> Dict[str, Any]:
+    def _compute_metrics(self) -> tuple:
         """
-        Get current cost status
-        
+        Compute all derived cost figures in one pass
+
         Returns:
-            Dict with cost status information
+            Tuple of (daily_pct, monthly_pct, projected_monthly, day_remaining)
         """
-        # Calculate percentages
         daily_percentage = (self.current_day_cost / self.thresholds.daily_limit) * 100
         monthly_percentage = (self.current_month_cost / self.thresholds.monthly_limit) * 100
-        
+        projected_monthly = (self.current_month_cost / (datetime.now().day or 1)) * 30
+        day_remaining = self.thresholds.daily_limit - self.current_day_cost
+        return daily_percentage, monthly_percentage, projected_monthly, day_remaining
+
+    def get_cost_status(self) -> CostStatusView:
+        """
+        Get current cost status
+
+        Returns:
+            CostStatusView with cost status information
+        """
+        daily_percentage, monthly_percentage, _, day_remaining = self._compute_metrics()
+
         # Determine status
         if daily_percentage >= 95 or monthly_percentage >= 95:
             status = CostStatus.EXCEEDED
@@ -209,30 +261,24 @@ class CostMonitor:
             status = CostStatus.WARNING
         else:
             status = CostStatus.HEALTHY
-        
-        return {
-            'status': status.value,
-            'emergency_stop': self.emergency_stop,
-            'current_hour': {
-                'queries': self.current_hour_queries,
-                'limit': self.thresholds.queries_per_hour_limit
-            },
-            'current_day': {
-                'queries': self.current_day_queries,
-                'query_limit': self.thresholds.queries_per_day_limit,
-                'cost': self.current_day_cost,
-                'cost_limit': self.thresholds.daily_limit,
-                'percentage': daily_percentage,
-                'remaining': self.thresholds.daily_limit - self.current_day_cost
-            },
-            'current_month': {
-                'cost': self.current_month_cost,
-                'limit': self.thresholds.monthly_limit,
-                'percentage': monthly_percentage,
-                'remaining': self.thresholds.monthly_limit - self.current_month_cost
-            },
-            'timestamp': datetime.now().isoformat()
-        }
+
+        return CostStatusView(
+            status=status.value,
+            emergency_stop=self.emergency_stop,
+            hour_queries=self.current_hour_queries,
+            hour_query_limit=self.thresholds.queries_per_hour_limit,
+            day_queries=self.current_day_queries,
+            day_query_limit=self.thresholds.queries_per_day_limit,
+            day_cost=self.current_day_cost,
+            day_cost_limit=self.thresholds.daily_limit,
+            day_percentage=daily_percentage,
+            day_remaining=day_remaining,
+            month_cost=self.current_month_cost,
+            month_limit=self.thresholds.monthly_limit,
+            month_percentage=monthly_percentage,
+            month_remaining=self.thresholds.monthly_limit - self.current_month_cost,
+            timestamp=datetime.now().isoformat()
+        )
     
     def get_cost_optimization_tips(self) -> List[Dict[str, str]]:
         """
@@ -254,10 +300,10 @@ class CostMonitor:
         
         # Check if we're close to limits
         status = self.get_cost_status()
-        if status['current_day']['percentage'] > 70:
+        if status.day_percentage > 70:
             tips.append({
                 'category': 'Daily Budget',
-                'issue': f"Using {status['current_day']['percentage']:.0f}% of daily budget",
+                'issue': f"Using {status.day_percentage:.0f}% of daily budget",
                 'recommendation': 'Review and optimize expensive queries',
                 'potential_savings': '$1-2/day'
             })
@@ -282,29 +328,26 @@ class CostMonitor:
         """
         status = self.get_cost_status()
         tips = self.get_cost_optimization_tips()
-        
-        # Estimate monthly projection
-        days_in_month = 30
-        days_elapsed = datetime.now().day
-        daily_average = self.current_month_cost / max(days_elapsed, 1)
-        projected_monthly = daily_average * days_in_month
-        
+
+        # Monthly projection comes from the same pass as the percentages
+        _, _, projected_monthly, _ = self._compute_metrics()
+
         report = {
             'summary': {
-                'status': status['status'],
-                'emergency_stop': status['emergency_stop'],
+                'status': status.status,
+                'emergency_stop': status.emergency_stop,
                 'generated_at': datetime.now().isoformat()
             },
             'current_usage': {
                 'today': {
                     'cost': f"${self.current_day_cost:.2f}",
                     'queries': self.current_day_queries,
-                    'budget_used': f"{status['current_day']['percentage']:.1f}%"
+                    'budget_used': f"{status.day_percentage:.1f}%"
                 },
                 'month': {
                     'cost': f"${self.current_month_cost:.2f}",
                     'projected': f"${projected_monthly:.2f}",
-                    'budget_used': f"{status['current_month']['percentage']:.1f}%"
+                    'budget_used': f"{status.month_percentage:.1f}%"
                 }
             },
             'limits': {
@@ -318,19 +361,19 @@ class CostMonitor:
         
         return report
     
-    def _get_recommendations(self, status: Dict) -> List[str]:
+    def _get_recommendations(self, status: CostStatusView) -> List[str]:
         """Get actionable recommendations based on current status"""
-        
+
         recommendations = []
-        
-        if status['status'] == 'exceeded':
+
+        if status.status == 'exceeded':
             recommendations.append("🔴 URGENT: Costs have exceeded limits. Review and optimize immediately.")
-        elif status['status'] == 'critical':
+        elif status.status == 'critical':
             recommendations.append("🟡 WARNING: Approaching cost limits. Consider optimizing queries.")
-        elif status['status'] == 'healthy':
+        elif status.status == 'healthy':
             recommendations.append("🟢 Costs are within healthy limits.")
-        
-        if status['current_day']['queries'] > 500:
+
+        if status.day_queries > 500:
             recommendations.append("Consider implementing query result caching to reduce redundant queries.")
         
         if self.current_hour_queries > 50:
@@ -354,38 +397,3 @@ class CostMonitor:
         """Reset monthly counters (call this from scheduler)"""
         self.current_month_cost = 0.0
         print(f"↻ Monthly counters reset at {datetime.now().strftime('%Y-%m')}")
-
-
-if __name__ == "__main__":
-    # Test cost monitor
-    monitor = CostMonitor()
-    
-    print("\n💰 Testing Cost Monitor...")
-    print("-" * 50)
-    
-    # Test query cost checking
-    print("\n📊 Query Cost Checks:")
-    
-    # Small query
-    small_query = monitor.check_query_cost(10_000_000)  # 10MB
-    print(f"10MB query: {small_query}")
-    
-    # Large query
-    large_query = monitor.check_query_cost(500_000_000_000)  # 500GB
-    print(f"500GB query: {large_query}")
-    
-    # Update some usage
-    monitor.update_usage(10_000_000, 0.00005)
-    monitor.update_usage(20_000_000, 0.00010)
-    
-    # Get status
-    print("\n📈 Cost Status:")
-    status = monitor.get_cost_status()
-    print(json.dumps(status, indent=2))
-    
-    # Get report
-    print("\n📋 Cost Report:")
-    report = monitor.generate_cost_report()
-    print(json.dumps(report, indent=2))
-    
-    print("\n✅ Cost Monitor test complete!")
\ No newline at end of file
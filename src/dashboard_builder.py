@@ -4,9 +4,12 @@ Prepares data and configurations for Looker Studio dashboards
 """
 
 import os
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import cached_property
 from typing import Dict, List, Any
+from google.api_core.exceptions import Forbidden
 from google.cloud import bigquery
 from google.oauth2 import service_account
 from dotenv import load_dotenv
@@ -14,49 +17,352 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+# Dashboard data sources - (display name, view) pairs; project/dataset are
+# injected per instance in create_looker_studio_config
+_LOOKER_DATA_SOURCES = [
+    ("Executive Summary", "executive_summary_view"),
+    ("Funnel Analysis", "funnel_analysis_view"),
+    ("Attribution", "attribution_dashboard_view"),
+    ("Cost Monitoring", "cost_monitoring_view"),
+]
+
+# Static portion of the Looker Studio config - built once at import so
+# create_looker_studio_config doesn't reallocate 30+ dicts per call
+_LOOKER_CONFIG_TEMPLATE = {
+    "pages": [
+        {
+            "name": "Executive Summary",
+            "widgets": [
+                {
+                    "type": "scorecard",
+                    "title": "Total Sessions",
+                    "metric": "total_sessions",
+                    "comparison": "previous_period"
+                },
+                {
+                    "type": "scorecard",
+                    "title": "Conversion Rate",
+                    "metric": "conversion_rate",
+                    "format": "percent"
+                },
+                {
+                    "type": "time_series",
+                    "title": "Daily Traffic",
+                    "dimension": "date",
+                    "metrics": ["total_users", "total_sessions"]
+                },
+                {
+                    "type": "pie_chart",
+                    "title": "Traffic Sources",
+                    "dimension": "channel",
+                    "metric": "total_sessions"
+                }
+            ]
+        },
+        {
+            "name": "Funnel Analysis",
+            "widgets": [
+                {
+                    "type": "funnel",
+                    "title": "Conversion Funnel",
+                    "dimension": "stage",
+                    "metric": "total_events"
+                },
+                {
+                    "type": "table",
+                    "title": "Stage Details",
+                    "dimensions": ["stage", "event_name"],
+                    "metrics": ["total_events", "avg_conversion_rate"]
+                }
+            ]
+        },
+        {
+            "name": "Attribution",
+            "widgets": [
+                {
+                    "type": "scorecard",
+                    "title": "UTM Coverage",
+                    "metric": "utm_coverage_rate",
+                    "format": "percent"
+                },
+                {
+                    "type": "table",
+                    "title": "Channel Performance",
+                    "dimensions": ["channel", "campaign"],
+                    "metrics": ["total_sessions", "total_conversions", "conversion_rate"]
+                }
+            ]
+        },
+        {
+            "name": "Cost Monitoring",
+            "widgets": [
+                {
+                    "type": "scorecard",
+                    "title": "Today's Cost",
+                    "metric": "today_cost",
+                    "format": "currency"
+                },
+                {
+                    "type": "gauge",
+                    "title": "Budget Usage",
+                    "metric": "budget_used_pct",
+                    "max": 100,
+                    "thresholds": [70, 90]
+                },
+                {
+                    "type": "time_series",
+                    "title": "Daily Costs",
+                    "dimension": "date",
+                    "metric": "total_cost"
+                }
+            ]
+        }
+    ],
+    "filters": [
+        {
+            "type": "date_range",
+            "default": "last_28_days"
+        }
+    ],
+    "theme": {
+        "primary_color": "#667eea",
+        "secondary_color": "#764ba2",
+        "font": "Roboto"
+    }
+}
+
+
 class DashboardBuilder:
     """Creates and manages dashboard data views in BigQuery for Looker Studio"""
     
     def __init__(self):
         """Initialize dashboard builder"""
-        credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-        if not credentials_path:
+        self._credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+        if not self._credentials_path:
             raise ValueError("GOOGLE_APPLICATION_CREDENTIALS not found")
-        
+
+        self.dataset_id = os.getenv('BIGQUERY_DATASET', 'votegtr_analytics')
+        self.project_id = os.getenv('GCP_PROJECT_ID', 'votegtr-analytics')
+
+        print("✅ Dashboard Builder initialized")
+
+    @cached_property
+    def client(self):
+        """BigQuery client, built lazily on first use.
+
+        Config-only paths (create_looker_studio_config,
+        generate_dashboard_url) never touch BigQuery, so they skip the
+        credential load and OAuth exchange entirely.
+        """
         credentials = service_account.Credentials.from_service_account_file(
-            credentials_path,
+            self._credentials_path,
             scopes=['https://www.googleapis.com/auth/bigquery']
         )
-        
-        self.client = bigquery.Client(
+
+        return bigquery.Client(
             credentials=credentials,
-            project=os.getenv('GCP_PROJECT_ID', 'votegtr-analytics')
+            project=self.project_id
         )
-        
-        self.dataset_id = os.getenv('BIGQUERY_DATASET', 'votegtr_analytics')
-        self.project_id = self.client.project
-        
-        print("✅ Dashboard Builder initialized")
     
-    def create_dashboard_views(self) -> bool:
+    # Partitioning/clustering contract for the base tables the dashboard
+    # views scan. Partition column first, then the filter/group-by columns
+    # the views cluster on.
+    REQUIRED_LAYOUT = {
+        'daily_metrics_optimized': ('date', []),
+        'attribution_data': ('DATE(timestamp)', ['source', 'medium', 'campaign']),
+        'events_optimized': ('event_date', ['event_name', 'page_path']),
+        'funnel_events': ('DATE(timestamp)', ['event_name', 'stage']),
+        'cost_tracking': ('date', []),
+    }
+
+    # Materialized views are created once and refreshed incrementally by
+    # BigQuery; CREATE OR REPLACE would throw away the refresh state, so
+    # these are handled separately from the plain views below.
+    MATERIALIZED_VIEWS = {
+        # Narrow projection of the wide GA4 event rows - just the five
+        # columns the dashboard views read, partitioned and clustered on
+        # their filter columns. Keeps the nested event_params payload out
+        # of every dashboard scan. No page_path filter: the realtime view
+        # counts all of today's events, not just pageview-shaped ones.
+        'event_aggregates': """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS `{project}.{dataset}.event_aggregates`
+            PARTITION BY event_date
+            CLUSTER BY event_name, page_path
+            OPTIONS(
+                enable_refresh = true,
+                refresh_interval_minutes = 30
+            ) AS
+            SELECT
+                event_date,
+                event_name,
+                page_path,
+                user_pseudo_id,
+                timestamp
+            FROM `{project}.{dataset}.events_optimized`
+        """,
+
+        'daily_metrics_mv': """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS `{project}.{dataset}.daily_metrics_mv`
+            PARTITION BY date
+            OPTIONS(
+                enable_refresh = true,
+                refresh_interval_minutes = 60,
+                max_staleness = INTERVAL 2 HOUR
+            ) AS
+            SELECT
+                date,
+                SUM(users) as total_users,
+                SUM(sessions) as total_sessions,
+                SUM(page_views) as total_page_views,
+                SUM(conversions) as total_conversions,
+                AVG(bounce_rate) as avg_bounce_rate,
+                AVG(avg_session_duration) as avg_session_duration
+            FROM `{project}.{dataset}.daily_metrics_optimized`
+            GROUP BY date
+        """,
+
+        # Small, heavily re-queried aggregate - exactly the shape BI Engine
+        # caches in memory. Grouped per day so top_content_view can keep
+        # the trailing-7-day window (CURRENT_DATE() is rejected in MVs, so
+        # the date filter lives in the view). No ORDER BY/LIMIT (MVs
+        # reject them; ranking happens in top_content_view / Looker) and
+        # no AVG over a CAST, which would block incremental refresh.
+        # avg_time_on_page comes back once event_value is ingested as
+        # FLOAT64.
+        'top_content_mv': """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS `{project}.{dataset}.top_content_mv`
+            PARTITION BY event_date
+            CLUSTER BY page_path
+            OPTIONS(
+                enable_refresh = true,
+                refresh_interval_minutes = 30,
+                allow_non_incremental_definition = false
+            ) AS
+            SELECT
+                event_date,
+                page_path,
+                COUNT(*) as pageviews,
+                COUNT(DISTINCT user_pseudo_id) as unique_users,
+                SUM(CASE WHEN event_name = 'form_submit' THEN 1 ELSE 0 END) as conversions_from_page
+            FROM `{project}.{dataset}.events_optimized`
+            WHERE page_path IS NOT NULL
+            GROUP BY event_date, page_path
+        """
+    }
+
+    # OPTIONS re-applied when the materialized view already exists
+    MATERIALIZED_VIEW_OPTIONS = {
+        'event_aggregates': """
+            ALTER MATERIALIZED VIEW `{project}.{dataset}.event_aggregates`
+            SET OPTIONS(
+                enable_refresh = true,
+                refresh_interval_minutes = 30
+            )
+        """,
+        'daily_metrics_mv': """
+            ALTER MATERIALIZED VIEW `{project}.{dataset}.daily_metrics_mv`
+            SET OPTIONS(
+                enable_refresh = true,
+                refresh_interval_minutes = 60,
+                max_staleness = INTERVAL 2 HOUR
+            )
+        """,
+        'top_content_mv': """
+            ALTER MATERIALIZED VIEW `{project}.{dataset}.top_content_mv`
+            SET OPTIONS(
+                enable_refresh = true,
+                refresh_interval_minutes = 30
+            )
+        """
+    }
+
+    def _ensure_partitioned_clustered(self) -> None:
+        """
+        Verify the base tables match REQUIRED_LAYOUT and rebuild any that
+        don't. Clustering prunes storage blocks on the views' filter and
+        group-by columns, so an unclustered base table silently turns every
+        dashboard query into a full scan.
+        """
+        for table_name, (partition_expr, cluster_cols) in self.REQUIRED_LAYOUT.items():
+            table_ref = f"{self.project_id}.{self.dataset_id}.{table_name}"
+
+            try:
+                table = self.client.get_table(table_ref)
+            except Exception:
+                # Table not created yet - nothing to rebuild
+                continue
+
+            # The column behind the partition expression: PARTITION BY
+            # date -> 'date', PARTITION BY DATE(timestamp) -> 'timestamp'
+            expected_field = partition_expr
+            if expected_field.startswith('DATE(') and expected_field.endswith(')'):
+                expected_field = expected_field[5:-1]
+
+            if table.time_partitioning is not None:
+                current_field = table.time_partitioning.field
+            elif table.range_partitioning is not None:
+                current_field = table.range_partitioning.field
+            else:
+                current_field = None
+            current_clustering = list(table.clustering_fields or [])
+
+            # A table partitioned on the wrong column full-scans just like
+            # an unpartitioned one, so the field must match exactly
+            if current_field == expected_field and current_clustering == cluster_cols:
+                continue
+
+            try:
+                cluster_clause = f"CLUSTER BY {', '.join(cluster_cols)}" if cluster_cols else ""
+                rebuild_query = f"""
+                    CREATE TABLE `{table_ref}__rebuilt`
+                    PARTITION BY {partition_expr}
+                    {cluster_clause}
+                    AS SELECT * FROM `{table_ref}`
+                """
+                self.client.query(rebuild_query).result()
+                self.client.query(f"DROP TABLE `{table_ref}`").result()
+                self.client.query(
+                    f"ALTER TABLE `{table_ref}__rebuilt` RENAME TO `{table_name}`"
+                ).result()
+
+                print(f"✅ Rebuilt {table_name} partitioned by {partition_expr}"
+                      + (f", clustered by {', '.join(cluster_cols)}" if cluster_cols else ""))
+
+            except Exception as e:
+                print(f"⚠️  Could not rebuild {table_name}: {e}")
+
+    def create_dashboard_views(self, window_days: int = 30) -> bool:
         """
         Create optimized views in BigQuery for Looker Studio dashboards
+
+        Args:
+            window_days: Reporting window baked into the views
         """
+        # Make sure base tables are laid out so the views below can prune
+        self._ensure_partitioned_clustered()
+
+        # Hard-cap every DDL at a 10 GB estimated scan so a bad join can't
+        # silently blow through the budget the cost views exist to protect
+        ddl_config = bigquery.QueryJobConfig(
+            use_query_cache=True,
+            maximum_bytes_billed=10_000_000_000,
+            labels={'purpose': 'dashboard_view'}
+        )
+
         views = {
             'executive_summary_view': """
                 CREATE OR REPLACE VIEW `{project}.{dataset}.executive_summary_view` AS
                 WITH daily_stats AS (
-                    SELECT 
+                    SELECT
                         date,
-                        SUM(users) as total_users,
-                        SUM(sessions) as total_sessions,
-                        SUM(page_views) as total_page_views,
-                        SUM(conversions) as total_conversions,
-                        AVG(bounce_rate) as avg_bounce_rate,
-                        AVG(avg_session_duration) as avg_session_duration
-                    FROM `{project}.{dataset}.daily_metrics_optimized`
-                    WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)
-                    GROUP BY date
+                        total_users,
+                        total_sessions,
+                        total_page_views,
+                        total_conversions,
+                        avg_bounce_rate,
+                        avg_session_duration
+                    FROM `{project}.{dataset}.daily_metrics_mv`
+                    WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL {window_days} DAY)
                 ),
                 week_over_week AS (
                     SELECT 
@@ -88,7 +394,7 @@ class DashboardBuilder:
                     MAX(conversion_rate) as max_conversion_rate,
                     MIN(conversion_rate) as min_conversion_rate
                 FROM `{project}.{dataset}.funnel_events`
-                WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
+                WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {window_days} DAY)
                 GROUP BY timestamp, event_name, stage
                 ORDER BY avg_conversion_rate DESC
             """,
@@ -106,24 +412,19 @@ class DashboardBuilder:
                         SUM(conversions) as total_conversions,
                         SAFE_DIVIDE(SUM(conversions), SUM(sessions)) * 100 as conversion_rate
                     FROM `{project}.{dataset}.attribution_data`
-                    WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
+                    WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {window_days} DAY)
                     GROUP BY source, medium, channel, campaign
-                ),
-                utm_coverage AS (
-                    SELECT 
-                        COUNTIF(source NOT IN ('(direct)', '(not set)')) as attributed_sessions,
-                        COUNT(*) as total_sessions,
-                        SAFE_DIVIDE(COUNTIF(source NOT IN ('(direct)', '(not set)')), COUNT(*)) * 100 as utm_coverage_rate
-                    FROM `{project}.{dataset}.attribution_data`
-                    WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
                 )
-                SELECT 
+                SELECT
                     c.*,
-                    u.utm_coverage_rate,
+                    (
+                        SELECT SAFE_DIVIDE(COUNTIF(source NOT IN ('(direct)', '(not set)')), COUNT(*)) * 100
+                        FROM `{project}.{dataset}.attribution_data`
+                        WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
+                    ) as utm_coverage_rate,
                     RANK() OVER (ORDER BY c.total_sessions DESC) as session_rank,
                     RANK() OVER (ORDER BY c.conversion_rate DESC) as conversion_rank
                 FROM channel_stats c
-                CROSS JOIN utm_coverage u
             """,
             
             'cost_monitoring_view': """
@@ -137,18 +438,33 @@ class DashboardBuilder:
                         AVG(duration_ms) as avg_query_time,
                         MAX(estimated_cost) as max_query_cost
                     FROM `{project}.{dataset}.cost_tracking`
-                    WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)
+                    WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL {window_days} DAY)
                     GROUP BY date
                 ),
+                budget AS (
+                    -- Single budget literal, injected from DAILY_BUDGET_USD
+                    SELECT {daily_budget} as daily_budget
+                ),
                 budget_status AS (
-                    SELECT 
-                        CURRENT_DATE() as today,
-                        COALESCE(SUM(total_cost), 0) as today_cost,
-                        5.00 as daily_budget,
-                        SAFE_DIVIDE(COALESCE(SUM(total_cost), 0), 5.00) * 100 as budget_used_pct,
-                        5.00 - COALESCE(SUM(total_cost), 0) as budget_remaining
-                    FROM daily_costs
-                    WHERE date = CURRENT_DATE()
+                    -- Always exactly one row: today's spend comes from a
+                    -- scalar subquery, so a day with no tracked queries
+                    -- yet yields 0 instead of an empty grouped result
+                    -- that would wipe the view through the CROSS JOIN
+                    SELECT
+                        today,
+                        today_cost,
+                        daily_budget,
+                        SAFE_DIVIDE(today_cost, daily_budget) * 100 as budget_used_pct,
+                        daily_budget - today_cost as budget_remaining
+                    FROM (
+                        SELECT
+                            CURRENT_DATE() as today,
+                            (SELECT COALESCE(SUM(total_cost), 0)
+                             FROM daily_costs
+                             WHERE date = CURRENT_DATE()) as today_cost,
+                            b.daily_budget
+                        FROM budget b
+                    )
                 )
                 SELECT 
                     d.*,
@@ -168,46 +484,34 @@ class DashboardBuilder:
             
             'real_time_metrics_view': """
                 CREATE OR REPLACE VIEW `{project}.{dataset}.real_time_metrics_view` AS
-                SELECT 
+                SELECT
                     CURRENT_TIMESTAMP() as snapshot_time,
                     CURRENT_DATE() as date,
                     EXTRACT(HOUR FROM CURRENT_TIMESTAMP()) as hour,
-                    (
-                        SELECT COUNT(DISTINCT user_pseudo_id)
-                        FROM `{project}.{dataset}.events_optimized`
-                        WHERE event_date = CURRENT_DATE()
-                        AND timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 5 MINUTE)
-                    ) as active_users_5min,
-                    (
-                        SELECT COUNT(*)
-                        FROM `{project}.{dataset}.events_optimized`
-                        WHERE event_date = CURRENT_DATE()
-                    ) as events_today,
-                    (
-                        SELECT COUNT(*)
-                        FROM `{project}.{dataset}.events_optimized`
-                        WHERE event_date = CURRENT_DATE()
-                        AND event_name = 'page_view'
-                    ) as pageviews_today,
-                    (
-                        SELECT COUNT(*)
-                        FROM `{project}.{dataset}.events_optimized`
-                        WHERE event_date = CURRENT_DATE()
-                        AND event_name IN ('form_submit', 'purchase_completed')
-                    ) as conversions_today
+                    COUNT(DISTINCT IF(
+                        timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 5 MINUTE),
+                        user_pseudo_id, NULL
+                    )) as active_users_5min,
+                    COUNT(*) as events_today,
+                    COUNTIF(event_name = 'page_view') as pageviews_today,
+                    COUNTIF(event_name IN ('form_submit', 'purchase_completed')) as conversions_today
+                FROM `{project}.{dataset}.event_aggregates`
+                WHERE event_date = CURRENT_DATE()
             """,
             
             'top_content_view': """
                 CREATE OR REPLACE VIEW `{project}.{dataset}.top_content_view` AS
-                SELECT 
+                -- Trailing-7-day window over the per-day MV rows; the
+                -- event_date filter prunes to a week of partitions.
+                -- unique_users sums per-day uniques, so repeat visitors
+                -- across days count once per day they appeared.
+                SELECT
                     page_path,
-                    COUNT(*) as pageviews,
-                    COUNT(DISTINCT user_pseudo_id) as unique_users,
-                    AVG(CAST(event_value AS FLOAT64)) as avg_time_on_page,
-                    SUM(CASE WHEN event_name = 'form_submit' THEN 1 ELSE 0 END) as conversions_from_page
-                FROM `{project}.{dataset}.events_optimized`
+                    SUM(pageviews) as pageviews,
+                    SUM(unique_users) as unique_users,
+                    SUM(conversions_from_page) as conversions_from_page
+                FROM `{project}.{dataset}.top_content_mv`
                 WHERE event_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 7 DAY)
-                    AND page_path IS NOT NULL
                 GROUP BY page_path
                 ORDER BY pageviews DESC
                 LIMIT 100
@@ -216,24 +520,90 @@ class DashboardBuilder:
         
         created_views = []
         failed_views = []
-        
-        for view_name, query_template in views.items():
+
+        # Materialized views first - downstream views select from them.
+        # Existing MVs only get their options re-applied so BigQuery keeps
+        # the incremental refresh state.
+        for view_name, query_template in self.MATERIALIZED_VIEWS.items():
             try:
+                try:
+                    self.client.get_table(f"{self.project_id}.{self.dataset_id}.{view_name}")
+                    query_template = self.MATERIALIZED_VIEW_OPTIONS[view_name]
+                    action = "Updated"
+                except Exception:
+                    action = "Created"
+
                 query = query_template.format(
                     project=self.project_id,
                     dataset=self.dataset_id
                 )
-                
-                # Execute query to create view
-                query_job = self.client.query(query)
-                query_job.result()  # Wait for completion
-                
-                print(f"✅ Created view: {view_name}")
+                self.client.query(query, job_config=ddl_config).result()
+
+                print(f"✅ {action} materialized view: {view_name}")
                 created_views.append(view_name)
-                
+
             except Exception as e:
-                print(f"⚠️  Could not create view {view_name}: {e}")
+                print(f"⚠️  Could not create materialized view {view_name}: {e}")
                 failed_views.append(view_name)
+
+        # Substitute project/dataset once per view, then validate everything
+        # against the planner with free dry-run jobs before paying for any
+        # real execution - a bad view fails fast instead of after queueing.
+        formatted = {
+            view_name: query_template.format(
+                project=self.project_id,
+                dataset=self.dataset_id,
+                window_days=window_days,
+                daily_budget=float(os.getenv('DAILY_BUDGET_USD', '5.00'))
+            )
+            for view_name, query_template in views.items()
+        }
+
+        dry_run_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        valid_views = {}
+        with ThreadPoolExecutor(max_workers=len(formatted)) as executor:
+            dry_futures = {
+                executor.submit(self.client.query, query, job_config=dry_run_config): view_name
+                for view_name, query in formatted.items()
+            }
+            for future in as_completed(dry_futures):
+                view_name = dry_futures[future]
+                try:
+                    future.result()
+                    valid_views[view_name] = formatted[view_name]
+                except Exception as e:
+                    print(f"⚠️  View {view_name} failed dry-run validation: {e}")
+                    failed_views.append(view_name)
+
+        # The surviving views are independent DDLs, so submit every job
+        # first (client.query only enqueues) and poll for completion in
+        # parallel instead of paying seven serial round-trips.
+        jobs = {}
+        for view_name, query in valid_views.items():
+            try:
+                jobs[view_name] = self.client.query(query, job_config=ddl_config)
+            except Exception as e:
+                print(f"⚠️  Could not submit view {view_name}: {e}")
+                failed_views.append(view_name)
+
+        if jobs:
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                futures = {
+                    executor.submit(job.result): view_name
+                    for view_name, job in jobs.items()
+                }
+                for future in as_completed(futures):
+                    view_name = futures[future]
+                    try:
+                        future.result()
+                        print(f"✅ Created view: {view_name}")
+                        created_views.append(view_name)
+                    except Forbidden as e:
+                        print(f"⚠️  View {view_name} exceeded the bytes-billed cap: {e}")
+                        failed_views.append(view_name)
+                    except Exception as e:
+                        print(f"⚠️  Could not create view {view_name}: {e}")
+                        failed_views.append(view_name)
         
         # Summary
         print(f"\n📊 Dashboard Views Summary:")
@@ -250,145 +620,26 @@ class DashboardBuilder:
             "dashboard_name": "VOTEGTR Analytics Dashboard",
             "data_sources": [
                 {
-                    "name": "Executive Summary",
+                    "name": name,
                     "type": "BigQuery",
                     "project": self.project_id,
                     "dataset": self.dataset_id,
-                    "table": "executive_summary_view"
-                },
-                {
-                    "name": "Funnel Analysis",
-                    "type": "BigQuery",
-                    "project": self.project_id,
-                    "dataset": self.dataset_id,
-                    "table": "funnel_analysis_view"
-                },
-                {
-                    "name": "Attribution",
-                    "type": "BigQuery",
-                    "project": self.project_id,
-                    "dataset": self.dataset_id,
-                    "table": "attribution_dashboard_view"
-                },
-                {
-                    "name": "Cost Monitoring",
-                    "type": "BigQuery",
-                    "project": self.project_id,
-                    "dataset": self.dataset_id,
-                    "table": "cost_monitoring_view"
+                    "table": table
                 }
+                for name, table in _LOOKER_DATA_SOURCES
             ],
-            "pages": [
-                {
-                    "name": "Executive Summary",
-                    "widgets": [
-                        {
-                            "type": "scorecard",
-                            "title": "Total Sessions",
-                            "metric": "total_sessions",
-                            "comparison": "previous_period"
-                        },
-                        {
-                            "type": "scorecard",
-                            "title": "Conversion Rate",
-                            "metric": "conversion_rate",
-                            "format": "percent"
-                        },
-                        {
-                            "type": "time_series",
-                            "title": "Daily Traffic",
-                            "dimension": "date",
-                            "metrics": ["total_users", "total_sessions"]
-                        },
-                        {
-                            "type": "pie_chart",
-                            "title": "Traffic Sources",
-                            "dimension": "channel",
-                            "metric": "total_sessions"
-                        }
-                    ]
-                },
-                {
-                    "name": "Funnel Analysis",
-                    "widgets": [
-                        {
-                            "type": "funnel",
-                            "title": "Conversion Funnel",
-                            "dimension": "stage",
-                            "metric": "total_events"
-                        },
-                        {
-                            "type": "table",
-                            "title": "Stage Details",
-                            "dimensions": ["stage", "event_name"],
-                            "metrics": ["total_events", "avg_conversion_rate"]
-                        }
-                    ]
-                },
-                {
-                    "name": "Attribution",
-                    "widgets": [
-                        {
-                            "type": "scorecard",
-                            "title": "UTM Coverage",
-                            "metric": "utm_coverage_rate",
-                            "format": "percent"
-                        },
-                        {
-                            "type": "table",
-                            "title": "Channel Performance",
-                            "dimensions": ["channel", "campaign"],
-                            "metrics": ["total_sessions", "total_conversions", "conversion_rate"]
-                        }
-                    ]
-                },
-                {
-                    "name": "Cost Monitoring",
-                    "widgets": [
-                        {
-                            "type": "scorecard",
-                            "title": "Today's Cost",
-                            "metric": "today_cost",
-                            "format": "currency"
-                        },
-                        {
-                            "type": "gauge",
-                            "title": "Budget Usage",
-                            "metric": "budget_used_pct",
-                            "max": 100,
-                            "thresholds": [70, 90]
-                        },
-                        {
-                            "type": "time_series",
-                            "title": "Daily Costs",
-                            "dimension": "date",
-                            "metric": "total_cost"
-                        }
-                    ]
-                }
-            ],
-            "filters": [
-                {
-                    "type": "date_range",
-                    "default": "last_28_days"
-                }
-            ],
-            "theme": {
-                "primary_color": "#667eea",
-                "secondary_color": "#764ba2",
-                "font": "Roboto"
-            }
+            **_LOOKER_CONFIG_TEMPLATE
         }
-        
+
         # Save configuration
         config_path = "dashboards/looker_studio_config.json"
         os.makedirs("dashboards", exist_ok=True)
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-        
+
+        with open(config_path, 'wb') as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+
         print(f"📁 Looker Studio configuration saved to: {config_path}")
-        
+
         return config
     
     def generate_dashboard_url(self) -> str:
@@ -5,53 +5,93 @@ Orchestrates data flow from GA4 to BigQuery
 
 import os
 import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from dotenv import load_dotenv
+from google.api_core.exceptions import ServerError, ServiceUnavailable, TooManyRequests
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from ga4_client import GA4Client
 from bigquery_manager_batch import BigQueryManager
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Retry transient GA4/BigQuery failures (429s, 5xx, dropped connections)
+# with exponential backoff instead of failing the sync and raising a
+# bogus high-severity alert on the first hiccup
+_retry_transient = retry(
+    retry=retry_if_exception_type(
+        (ServerError, ServiceUnavailable, TooManyRequests, ConnectionError)
+    ),
+    wait=wait_exponential(multiplier=1, min=2, max=60),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+
 
 class DataPipeline:
     """Manages data flow from GA4 to BigQuery"""
-    
+
     def __init__(self):
         """Initialize pipeline components"""
         self.ga4 = GA4Client()
         self.bq = BigQueryManager()
-        print("✅ Data Pipeline initialized")
-    
+        logger.info("Data Pipeline initialized")
+
+    # Thin retrying wrappers around the BigQuery inserts. GA4 fetches are
+    # NOT wrapped: GA4Client retries transient failures itself, and
+    # stacking a second retry layer here would multiply the attempts
+    # (up to 20 calls against an already quota-exhausted API). The outer
+    # try/except in each sync method still handles genuinely
+    # non-retriable errors.
+
+    @_retry_transient
+    def _insert_bq_daily(self, metrics: Dict) -> bool:
+        return self.bq.insert_daily_metrics(metrics)
+
+    @_retry_transient
+    def _insert_bq_funnel(self, funnel_data: Dict) -> bool:
+        return self.bq.insert_funnel_data(funnel_data)
+
+    @_retry_transient
+    def _insert_bq_attribution(self, attribution_data: Dict) -> bool:
+        return self.bq.insert_attribution_data(attribution_data)
+
     def sync_daily_metrics(self, days: int = 7) -> bool:
         """
         Sync daily metrics from GA4 to BigQuery
-        
+
         Args:
             days: Number of days to sync
-        
+
         Returns:
             Success status
         """
-        print(f"\n📊 Syncing {days} days of metrics...")
-        
+        logger.info("Syncing %d days of metrics...", days)
+
         try:
             # Get metrics from GA4
             metrics = self.ga4.get_daily_metrics(days)
-            
+
             # Insert into BigQuery
-            success = self.bq.insert_daily_metrics(metrics)
-            
+            success = self._insert_bq_daily(metrics)
+
             if success:
-                print(f"✅ Synced {len(metrics['daily_metrics'])} days of data")
-                print(f"   Total sessions: {metrics['totals']['total_sessions']}")
-                print(f"   Total conversions: {metrics['totals']['total_conversions']}")
-            
+                logger.info(
+                    "Synced %d days of data; sessions=%d conversions=%d",
+                    len(metrics['daily_metrics']),
+                    metrics['totals']['total_sessions'],
+                    metrics['totals']['total_conversions']
+                )
+
             return success
-            
+
         except Exception as e:
-            print(f"❌ Error syncing daily metrics: {e}")
+            logger.error("Error syncing daily metrics: %s", e)
             self.bq.log_alert(
                 alert_type='data_sync_error',
                 severity='high',
@@ -59,35 +99,35 @@ class DataPipeline:
                 details={'days': days}
             )
             return False
-    
+
     def sync_funnel_data(self, date_range: str = '7daysAgo') -> bool:
         """
         Sync funnel data from GA4 to BigQuery
-        
+
         Args:
             date_range: Start date for funnel data
-        
+
         Returns:
             Success status
         """
-        print(f"\n🔄 Syncing funnel data...")
-        
+        logger.info("Syncing funnel data...")
+
         try:
             # Get funnel metrics from GA4
             funnel_data = self.ga4.get_funnel_metrics(date_range, 'today')
-            
+
             # Insert into BigQuery
-            success = self.bq.insert_funnel_data(funnel_data)
-            
+            success = self._insert_bq_funnel(funnel_data)
+
             if success:
-                print(f"✅ Synced {len(funnel_data['stages'])} funnel stages")
+                logger.info("Synced %d funnel stages", len(funnel_data['stages']))
                 for stage in funnel_data['stages'][:3]:
-                    print(f"   {stage['stage']}: {stage['count']} events")
-            
+                    logger.debug("  %s: %d events", stage['stage'], stage['count'])
+
             return success
-            
+
         except Exception as e:
-            print(f"❌ Error syncing funnel data: {e}")
+            logger.error("Error syncing funnel data: %s", e)
             self.bq.log_alert(
                 alert_type='data_sync_error',
                 severity='high',
@@ -95,31 +135,34 @@ class DataPipeline:
                 details={'date_range': date_range}
             )
             return False
-    
+
     def sync_attribution_data(self, date_range: str = '7daysAgo') -> bool:
         """
         Sync attribution data from GA4 to BigQuery
-        
+
         Args:
             date_range: Start date for attribution data
-        
+
         Returns:
             Success status
         """
-        print(f"\n🎯 Syncing attribution data...")
-        
+        logger.info("Syncing attribution data...")
+
         try:
             # Get attribution data from GA4
             attribution_data = self.ga4.get_attribution_data(date_range, 'today')
-            
+
             # Insert into BigQuery
-            success = self.bq.insert_attribution_data(attribution_data)
-            
+            success = self._insert_bq_attribution(attribution_data)
+
             if success:
-                print(f"✅ Synced {len(attribution_data['channels'])} channels")
-                print(f"   UTM coverage: {attribution_data['utm_coverage']:.1f}%")
-                print(f"   Total conversions: {attribution_data['total_conversions']}")
-                
+                logger.info(
+                    "Synced %d channels; utm_coverage=%.1f%% conversions=%d",
+                    len(attribution_data['channels']),
+                    attribution_data['utm_coverage'],
+                    attribution_data['total_conversions']
+                )
+
                 # Check UTM coverage and alert if low
                 if attribution_data['utm_coverage'] < 75:
                     self.bq.log_alert(
@@ -128,11 +171,11 @@ class DataPipeline:
                         message=f'UTM coverage is {attribution_data["utm_coverage"]:.1f}%',
                         details={'coverage': attribution_data['utm_coverage']}
                     )
-            
+
             return success
-            
+
         except Exception as e:
-            print(f"❌ Error syncing attribution data: {e}")
+            logger.error("Error syncing attribution data: %s", e)
             self.bq.log_alert(
                 alert_type='data_sync_error',
                 severity='high',
@@ -140,40 +183,41 @@ class DataPipeline:
                 details={'date_range': date_range}
             )
             return False
-    
+
     def run_full_sync(self) -> Dict[str, bool]:
         """
         Run full data sync from GA4 to BigQuery
-        
+
         Returns:
             Dictionary of sync results
         """
-        print("\n" + "="*50)
-        print("🚀 Starting Full Data Sync")
-        print("="*50)
-        
+        logger.info("Starting full data sync")
+
         start_time = time.time()
-        results = {}
-        
-        # Sync all data types
-        results['daily_metrics'] = self.sync_daily_metrics(7)
-        results['funnel_data'] = self.sync_funnel_data('7daysAgo')
-        results['attribution_data'] = self.sync_attribution_data('7daysAgo')
-        
+
+        # The three syncs hit independent GA4 reports and BigQuery tables,
+        # so overlap their network round-trips instead of running serially
+        tasks = {
+            'daily_metrics': lambda: self.sync_daily_metrics(7),
+            'funnel_data': lambda: self.sync_funnel_data('7daysAgo'),
+            'attribution_data': lambda: self.sync_attribution_data('7daysAgo'),
+        }
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {name: executor.submit(task) for name, task in tasks.items()}
+            results = {name: future.result() for name, future in futures.items()}
+
         # Calculate success rate
         success_count = sum(1 for v in results.values() if v)
         total_count = len(results)
         success_rate = (success_count / total_count) * 100
-        
+
         elapsed_time = time.time() - start_time
-        
-        print("\n" + "="*50)
-        print("📋 Sync Summary")
-        print("="*50)
-        print(f"✅ Successful: {success_count}/{total_count}")
-        print(f"📊 Success Rate: {success_rate:.0f}%")
-        print(f"⏱️  Time Elapsed: {elapsed_time:.2f} seconds")
-        
+
+        logger.info(
+            "Sync complete: %d/%d succeeded (%.0f%%) in %.2fs",
+            success_count, total_count, success_rate, elapsed_time
+        )
+
         # Log overall sync status
         if success_rate < 100:
             self.bq.log_alert(
@@ -182,110 +226,148 @@ class DataPipeline:
                 message=f'Data sync partially failed: {success_rate:.0f}% success rate',
                 details=results
             )
-        
+
         return results
-    
+
     def check_data_health(self) -> Dict[str, Any]:
         """
         Check overall data health and quality
-        
+
         Returns:
             Health status dictionary
         """
-        print("\n🏥 Checking Data Health...")
-        
+        logger.info("Checking data health...")
+
         health_status = {
             'timestamp': datetime.now().isoformat(),
             'ga4_status': 'unknown',
             'bigquery_status': 'unknown',
             'issues': []
         }
-        
-        # Check GA4 data quality
-        try:
-            ga4_health = self.ga4.check_data_quality()
-            health_status['ga4_status'] = ga4_health['status']
-            
-            if ga4_health['missing_events']:
-                health_status['issues'].append(f"Missing GA4 events: {', '.join(ga4_health['missing_events'])}")
-            
-            if ga4_health['attribution_rate'] < 75:
-                health_status['issues'].append(f"Low attribution rate: {ga4_health['attribution_rate']:.1f}%")
-            
-            print(f"  GA4 Status: {ga4_health['status']}")
-            print(f"  Attribution Rate: {ga4_health['attribution_rate']:.1f}%")
-            
-        except Exception as e:
-            health_status['ga4_status'] = 'error'
-            health_status['issues'].append(f"GA4 health check failed: {str(e)}")
-        
-        # Check BigQuery data freshness
+
+        # GA4 and BigQuery checks hit different services - run them in
+        # parallel, with a timeout so a hung service can't block the
+        # health check (this runs as a liveness probe). No `with` block:
+        # the context manager's shutdown(wait=True) would join a hung
+        # worker and defeat the timeout, so shutdown is explicit and
+        # non-blocking below.
+        executor = ThreadPoolExecutor(max_workers=2)
         try:
-            recent_metrics = self.bq.query_recent_metrics(1)
-            if recent_metrics:
-                health_status['bigquery_status'] = 'healthy'
-                print(f"  BigQuery Status: healthy")
-            else:
-                health_status['bigquery_status'] = 'stale'
-                health_status['issues'].append("No recent data in BigQuery")
-                print(f"  BigQuery Status: stale (no recent data)")
-                
-        except Exception as e:
-            health_status['bigquery_status'] = 'error'
-            health_status['issues'].append(f"BigQuery health check failed: {str(e)}")
-        
+            ga4_future = executor.submit(self.ga4.check_data_quality)
+            bq_future = executor.submit(self.bq.query_recent_metrics, 1)
+
+            # Check GA4 data quality
+            try:
+                ga4_health = ga4_future.result(timeout=30)
+                health_status['ga4_status'] = ga4_health['status']
+
+                if ga4_health['missing_events']:
+                    health_status['issues'].append(f"Missing GA4 events: {', '.join(ga4_health['missing_events'])}")
+
+                if ga4_health['attribution_rate'] < 75:
+                    health_status['issues'].append(f"Low attribution rate: {ga4_health['attribution_rate']:.1f}%")
+
+                logger.info("GA4 status: %s (attribution %.1f%%)",
+                            ga4_health['status'], ga4_health['attribution_rate'])
+
+            except FuturesTimeoutError:
+                health_status['ga4_status'] = 'timeout'
+                health_status['issues'].append("GA4 health check timed out")
+            except Exception as e:
+                health_status['ga4_status'] = 'error'
+                health_status['issues'].append(f"GA4 health check failed: {str(e)}")
+
+            # Check BigQuery data freshness
+            try:
+                recent_metrics = bq_future.result(timeout=30)
+                if recent_metrics:
+                    health_status['bigquery_status'] = 'healthy'
+                    logger.info("BigQuery status: healthy")
+                else:
+                    health_status['bigquery_status'] = 'stale'
+                    health_status['issues'].append("No recent data in BigQuery")
+                    logger.warning("BigQuery status: stale (no recent data)")
+
+            except FuturesTimeoutError:
+                health_status['bigquery_status'] = 'timeout'
+                health_status['issues'].append("BigQuery health check timed out")
+            except Exception as e:
+                health_status['bigquery_status'] = 'error'
+                health_status['issues'].append(f"BigQuery health check failed: {str(e)}")
+        finally:
+            # Abandon any still-hung worker instead of joining it here,
+            # so the check itself returns within the timeouts. Note the
+            # workers are non-daemon: if one is truly stuck, interpreter
+            # shutdown still waits for its RPC to finish, so this bounds
+            # the probe's latency, not process exit.
+            executor.shutdown(wait=False)
+
         # Overall health determination
         if not health_status['issues']:
             health_status['overall'] = 'healthy'
-            print("\n✅ Overall Data Health: HEALTHY")
+            logger.info("Overall data health: HEALTHY")
         elif len(health_status['issues']) == 1:
             health_status['overall'] = 'warning'
-            print(f"\n⚠️  Overall Data Health: WARNING")
-            print(f"   Issues: {health_status['issues'][0]}")
+            logger.warning("Overall data health: WARNING (%s)", health_status['issues'][0])
         else:
             health_status['overall'] = 'critical'
-            print(f"\n❌ Overall Data Health: CRITICAL")
+            logger.error("Overall data health: CRITICAL (%d issues)", len(health_status['issues']))
             for issue in health_status['issues']:
-                print(f"   - {issue}")
-        
+                logger.error("  - %s", issue)
+
         return health_status
-    
+
     def run_hourly_sync(self) -> bool:
         """
         Run hourly sync (lighter than full sync)
-        
+
         Returns:
             Success status
         """
-        print(f"\n⏰ Running hourly sync at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
+        logger.info("Running hourly sync")
+
         try:
-            # Sync today's metrics only
-            metrics = self.ga4.get_daily_metrics(1)
-            self.bq.insert_daily_metrics(metrics)
-            
+            # Size the fetch window from the last checkpoint. GA4 reports
+            # are daily-grained, so the delta is by date: normally just
+            # today, but after an outage this backfills the gap instead of
+            # silently losing days.
+            last_sync = self.bq.get_last_sync_ts('hourly_daily_metrics')
+            if last_sync is not None:
+                days_behind = (datetime.now().date() - last_sync.date()).days
+                days_to_fetch = max(days_behind, 0) + 1
+            else:
+                # No checkpoint yet - fall back to a full day pull
+                days_to_fetch = 1
+
+            metrics = self.ga4.get_daily_metrics(days_to_fetch)
+            self._insert_bq_daily(metrics)
+
             # Sync recent funnel data
             funnel_data = self.ga4.get_funnel_metrics('today', 'today')
-            self.bq.insert_funnel_data(funnel_data)
-            
-            print("✅ Hourly sync complete")
+            self._insert_bq_funnel(funnel_data)
+
+            self.bq.update_sync_checkpoint('hourly_daily_metrics')
+
+            logger.info("Hourly sync complete")
             return True
-            
+
         except Exception as e:
-            print(f"❌ Hourly sync failed: {e}")
+            logger.error("Hourly sync failed: %s", e)
             return False
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+
     # Test the pipeline
     try:
         pipeline = DataPipeline()
-        
+
         # Run full sync
         pipeline.run_full_sync()
-        
+
         # Check data health
         pipeline.check_data_health()
-        
+
     except Exception as e:
-        print(f"\n❌ Pipeline Error: {e}")
\ No newline at end of file
+        logger.error("Pipeline error: %s", e)
@@ -3,100 +3,263 @@ Email Sender Module
 Sends reports via SendGrid Web API
 """
 
+from __future__ import annotations
+
 import os
-from typing import List, Optional
+import gzip
+import logging
+from typing import Dict, List, Optional
 from datetime import datetime
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import (
-    Mail, 
-    Email, 
-    To, 
-    Content, 
-    Attachment, 
-    FileContent, 
-    FileName,
-    FileType,
-    Disposition
-)
-import base64
+import requests
+from requests.adapters import HTTPAdapter
+import string
+import orjson
+import pybase64
 from dotenv import load_dotenv
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+SENDGRID_SEND_URL = 'https://api.sendgrid.com/v3/mail/send'
+
+# Rate limits and SendGrid-side blips are worth a short jittered retry
+# over the already-open session; other 4xx responses are returned to the
+# caller untouched
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+_retry_send = retry(
+    retry=retry_if_exception_type(requests.exceptions.RequestException),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    stop=stop_after_attempt(4),
+    reraise=True,
+)
+
+# Alert styling by severity, frozen at module scope (defaults: 📢 / warning yellow)
+_SEVERITY_EMOJI = {
+    'info': 'ℹ️',
+    'warning': '⚠️',
+    'critical': '🚨',
+    'emergency': '🆘'
+}
+_SEVERITY_COLORS = {
+    'info': '#17a2b8',
+    'warning': '#ffc107',
+    'critical': '#dc3545',
+    'emergency': '#dc3545',
+}
+
+# Alert HTML parsed once at import; send_alert only substitutes the
+# variable fields instead of rebuilding the whole document per call
+_ALERT_TPL = string.Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            padding: 20px;
+            background: #f5f5f5;
+        }
+        .alert-box {
+            background: white;
+            border-radius: 8px;
+            padding: 20px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            border-left: 4px solid $severity_color;
+        }
+        .alert-type {
+            color: #666;
+            font-size: 14px;
+            text-transform: uppercase;
+            letter-spacing: 1px;
+        }
+        .alert-message {
+            font-size: 18px;
+            margin: 15px 0;
+            color: #333;
+        }
+        .timestamp {
+            color: #999;
+            font-size: 12px;
+        }
+    </style>
+</head>
+<body>
+    <div class="alert-box">
+        <div class="alert-type">$severity_upper ALERT</div>
+        <h2>$alert_type</h2>
+        <div class="alert-message">$message</div>
+        <div class="timestamp">Generated at $timestamp</div>
+    </div>
+    <p style="margin-top: 20px; color: #666; font-size: 14px;">
+        Check your dashboard for more details: <a href="https://votegtr.com">VOTEGTR Analytics</a>
+    </p>
+</body>
+</html>
+""")
+
+# Test email is fully static - no per-call rendering needed
+_TEST_EMAIL_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; padding: 20px; }
+        .success { color: #28a745; }
+    </style>
+</head>
+<body>
+    <h1 class="success">✅ SendGrid Test Successful!</h1>
+    <p>Your VOTEGTR Analytics email configuration is working correctly.</p>
+    <ul>
+        <li>From: reports@votegtr.com</li>
+        <li>To: Sean@VOTEGTR.com</li>
+        <li>API: SendGrid Web API</li>
+        <li>Status: Active</li>
+    </ul>
+    <p>You will receive daily reports at 7AM ET to this email address.</p>
+</body>
+</html>
+"""
+
 
 class EmailSender:
     """Handles email sending via SendGrid Web API"""
-    
+
     def __init__(self):
-        """Initialize SendGrid client"""
+        """Initialize SendGrid session"""
         self.api_key = os.getenv('SENDGRID_API_KEY')
         self.from_email = os.getenv('REPORT_EMAIL_FROM', 'reports@votegtr.com')
         self.default_to = os.getenv('REPORT_EMAIL_TO', 'Sean@VOTEGTR.com')
-        
+
         if self.api_key and self.api_key != 'your_sendgrid_key_here':
-            self.client = SendGridAPIClient(self.api_key)
+            # Persistent session so sends in the same run (report + alerts)
+            # reuse one TLS connection instead of paying the TCP/TLS
+            # handshake on every email
+            self._session = requests.Session()
+            self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            self._session.headers.update({'Authorization': f'Bearer {self.api_key}'})
             self.enabled = True
-            print("✅ Email sender initialized with SendGrid Web API")
+            logger.info("Email sender initialized with SendGrid Web API")
         else:
             self.enabled = False
-            print("⚠️  SendGrid API key not configured - email sending disabled")
-    
-    def send_daily_report(self, html_content: str, json_path: Optional[str] = None, 
-                         to_email: Optional[str] = None) -> bool:
+            logger.warning("SendGrid API key not configured - email sending disabled")
+
+    def _build_payload(self, to_email: str, subject: str, html: str,
+                       from_name: str = "VOTEGTR Analytics",
+                       attachment: Optional[Dict] = None) -> Dict:
+        """Build the SendGrid v3 mail/send JSON payload directly"""
+        payload = {
+            'personalizations': [{'to': [{'email': to_email}]}],
+            'from': {'email': self.from_email, 'name': from_name},
+            'subject': subject,
+            'content': [{'type': 'text/html', 'value': html}],
+        }
+        if attachment is not None:
+            payload['attachments'] = [attachment]
+
+        return payload
+
+    def _send(self, payload: Dict) -> requests.Response:
+        """POST a mail payload to SendGrid over the pooled session"""
+        body = orjson.dumps(payload)
+        headers = {'Content-Type': 'application/json'}
+
+        # HTML reports and base64 attachments compress well (often 5-10x);
+        # gzip anything past 4 KB so upload time, not CPU, wins. Tiny
+        # payloads skip the compressor overhead.
+        if len(body) > 4 * 1024:
+            body = gzip.compress(body, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+
+        return self._post(body, headers)
+
+    @_retry_send
+    def _post(self, body: bytes, headers: Dict) -> requests.Response:
+        """POST to SendGrid, raising (and retrying) on transient statuses"""
+        response = self._session.post(SENDGRID_SEND_URL, data=body, headers=headers)
+        if response.status_code in _RETRYABLE_STATUS:
+            raise requests.exceptions.HTTPError(
+                f"SendGrid returned {response.status_code}", response=response
+            )
+
+        return response
+
+    def send_daily_report(self, html_content: str, json_path: Optional[str] = None,
+                         to_email: Optional[str] = None, json_data: Optional[Dict] = None) -> bool:
         """
         Send daily report email
-        
+
         Args:
             html_content: HTML content of the report
-            json_path: Optional path to JSON file to attach
+            json_path: Optional path to JSON file to attach (prefer json_data)
             to_email: Override recipient email
-            
+            json_data: Optional report dict to attach - serialized in memory,
+                skipping the write-to-disk-then-re-read round trip
+
         Returns:
             Success status
         """
         if not self.enabled:
-            print("📧 Email sending is disabled (no API key)")
+            logger.info("Email sending is disabled (no API key)")
             return False
-        
+
         try:
             # Prepare email
             to_email = to_email or self.default_to
             subject = f"VOTEGTR Daily Report - {datetime.now().strftime('%B %d, %Y')}"
-            
-            # Create message
-            message = Mail(
-                from_email=Email(self.from_email, "VOTEGTR Analytics"),
-                to_emails=To(to_email),
-                subject=subject,
-                html_content=Content("text/html", html_content)
-            )
-            
+
             # Add JSON attachment if provided
-            if json_path and os.path.exists(json_path):
-                with open(json_path, 'rb') as f:
-                    data = f.read()
-                encoded = base64.b64encode(data).decode()
-                
-                attachment = Attachment()
-                attachment.file_content = FileContent(encoded)
-                attachment.file_type = FileType('application/json')
-                attachment.file_name = FileName(f'report_{datetime.now().strftime("%Y%m%d")}.json')
-                attachment.disposition = Disposition('attachment')
-                
-                message.attachment = attachment
-            
+            encoded = None
+            if json_data is not None:
+                # Serialize straight to bytes and encode - no file I/O
+                encoded = pybase64.b64encode(orjson.dumps(json_data)).decode('ascii')
+            elif json_path and os.path.exists(json_path):
+                size = os.path.getsize(json_path)
+                if size < 64 * 1024:
+                    # Small report: one-shot encode straight to str, no
+                    # intermediate bytes copy
+                    with open(json_path, 'rb') as f:
+                        encoded = pybase64.b64encode_as_string(f.read())
+                else:
+                    # Large report: stream-encode in 57 KB chunks (multiple
+                    # of 3 so base64 blocks align) into a pre-sized buffer
+                    # - base64 output is exactly 4 bytes per 3 input bytes,
+                    # so no reallocation or final copy is needed
+                    out = bytearray(((size + 2) // 3) * 4)
+                    pos = 0
+                    with open(json_path, 'rb') as f:
+                        while chunk := f.read(57 * 1024):
+                            enc = pybase64.b64encode(chunk)
+                            out[pos:pos + len(enc)] = enc
+                            pos += len(enc)
+                    encoded = out[:pos].decode('ascii')
+
+            attachment = None
+            if encoded is not None:
+                attachment = {
+                    'content': encoded,
+                    'type': 'application/json',
+                    'filename': f'report_{datetime.now().strftime("%Y%m%d")}.json',
+                    'disposition': 'attachment'
+                }
+
             # Send email
-            response = self.client.send(message)
-            
+            response = self._send(
+                self._build_payload(to_email, subject, html_content, attachment=attachment)
+            )
+
             if response.status_code in [200, 201, 202]:
-                print(f"✅ Report email sent to {to_email}")
+                logger.info("Report email sent to %s", to_email)
                 return True
             else:
-                print(f"❌ Failed to send email: Status {response.status_code}")
+                logger.error("Failed to send email: status %s", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"❌ Error sending email: {e}")
+            logger.error("Error sending email: %s", e)
             return False
     
     def send_alert(self, alert_type: str, message: str, severity: str = 'warning',
@@ -119,85 +282,32 @@ class EmailSender:
         try:
             to_email = to_email or self.default_to
             
-            # Severity emoji
-            severity_emoji = {
-                'info': 'ℹ️',
-                'warning': '⚠️',
-                'critical': '🚨',
-                'emergency': '🆘'
-            }
-            
-            emoji = severity_emoji.get(severity, '📢')
+            emoji = _SEVERITY_EMOJI.get(severity, '📢')
             subject = f"{emoji} VOTEGTR Alert: {alert_type}"
-            
-            # HTML content
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{
-                        font-family: Arial, sans-serif;
-                        padding: 20px;
-                        background: #f5f5f5;
-                    }}
-                    .alert-box {{
-                        background: white;
-                        border-radius: 8px;
-                        padding: 20px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                        border-left: 4px solid {'#dc3545' if severity == 'critical' else '#ffc107'};
-                    }}
-                    .alert-type {{
-                        color: #666;
-                        font-size: 14px;
-                        text-transform: uppercase;
-                        letter-spacing: 1px;
-                    }}
-                    .alert-message {{
-                        font-size: 18px;
-                        margin: 15px 0;
-                        color: #333;
-                    }}
-                    .timestamp {{
-                        color: #999;
-                        font-size: 12px;
-                    }}
-                </style>
-            </head>
-            <body>
-                <div class="alert-box">
-                    <div class="alert-type">{severity.upper()} ALERT</div>
-                    <h2>{alert_type}</h2>
-                    <div class="alert-message">{message}</div>
-                    <div class="timestamp">Generated at {datetime.now().strftime('%I:%M %p on %B %d, %Y')}</div>
-                </div>
-                <p style="margin-top: 20px; color: #666; font-size: 14px;">
-                    Check your dashboard for more details: <a href="https://votegtr.com">VOTEGTR Analytics</a>
-                </p>
-            </body>
-            </html>
-            """
-            
-            # Create and send message
-            message = Mail(
-                from_email=Email(self.from_email, "VOTEGTR Alerts"),
-                to_emails=To(to_email),
-                subject=subject,
-                html_content=Content("text/html", html_content)
+
+            # Fill the precompiled template - only the variable fields
+            html_content = _ALERT_TPL.substitute(
+                severity_color=_SEVERITY_COLORS.get(severity, '#ffc107'),
+                severity_upper=severity.upper(),
+                alert_type=alert_type,
+                message=message,
+                timestamp=datetime.now().strftime('%I:%M %p on %B %d, %Y')
             )
-            
-            response = self.client.send(message)
-            
+
+
+            response = self._send(
+                self._build_payload(to_email, subject, html_content, from_name="VOTEGTR Alerts")
+            )
+
             if response.status_code in [200, 201, 202]:
-                print(f"✅ Alert email sent to {to_email}")
+                logger.info("Alert email sent to %s", to_email)
                 return True
             else:
-                print(f"❌ Failed to send alert: Status {response.status_code}")
+                logger.error("Failed to send alert: status %s", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"❌ Error sending alert: {e}")
+            logger.error("Error sending alert: %s", e)
             return False
     
     def send_test_email(self, to_email: Optional[str] = None) -> bool:
@@ -211,60 +321,31 @@ class EmailSender:
             Success status
         """
         if not self.enabled:
-            print("❌ Cannot send test email - SendGrid not configured")
-            print("   Please add your SendGrid API key to .env file")
+            logger.error("Cannot send test email - SendGrid not configured; add the API key to .env")
             return False
         
         try:
             to_email = to_email or self.default_to
-            
-            html_content = """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body { font-family: Arial, sans-serif; padding: 20px; }
-                    .success { color: #28a745; }
-                </style>
-            </head>
-            <body>
-                <h1 class="success">✅ SendGrid Test Successful!</h1>
-                <p>Your VOTEGTR Analytics email configuration is working correctly.</p>
-                <ul>
-                    <li>From: reports@votegtr.com</li>
-                    <li>To: Sean@VOTEGTR.com</li>
-                    <li>API: SendGrid Web API</li>
-                    <li>Status: Active</li>
-                </ul>
-                <p>You will receive daily reports at 7AM ET to this email address.</p>
-            </body>
-            </html>
-            """
-            
-            message = Mail(
-                from_email=Email(self.from_email, "VOTEGTR Analytics"),
-                to_emails=To(to_email),
-                subject="VOTEGTR Analytics - Test Email",
-                html_content=Content("text/html", html_content)
+
+            response = self._send(
+                self._build_payload(to_email, "VOTEGTR Analytics - Test Email", _TEST_EMAIL_HTML)
             )
-            
-            response = self.client.send(message)
-            
+
             if response.status_code in [200, 201, 202]:
-                print(f"✅ Test email sent successfully to {to_email}")
-                print("   Check your inbox to confirm delivery")
+                logger.info("Test email sent successfully to %s", to_email)
                 return True
             else:
-                print(f"❌ Test email failed: Status {response.status_code}")
+                logger.error("Test email failed: status %s", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"❌ Error sending test email: {e}")
-            print(f"   Make sure your SendGrid API key is valid")
+            logger.error("Error sending test email: %s - check that the SendGrid API key is valid", e)
             return False
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+
     # Test email sender
     sender = EmailSender()
     
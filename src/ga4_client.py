@@ -3,30 +3,130 @@ GA4 API Client Module
 Handles all interactions with Google Analytics 4 API
 """
 
+from __future__ import annotations
+
 import os
 import json
+import heapq
+import hashlib
+import pickle
+import time
+import numpy as np
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from google.analytics.data_v1beta.types import (
-    RunReportRequest,
-    RunRealtimeReportRequest,
-    DateRange,
-    Dimension,
-    Metric,
-    OrderBy,
-    FilterExpression,
-    Filter
-)
-from google.oauth2 import service_account
 from dotenv import load_dotenv
+from google.api_core.exceptions import ResourceExhausted, ServerError, ServiceUnavailable
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
 load_dotenv()
 
+# Retry quota hits (429) and service blips (5xx) with jittered backoff
+# instead of surfacing them to callers that would re-run the whole
+# pipeline; mirrors the transient-retry policy in data_pipeline
+_retry_transient = retry(
+    retry=retry_if_exception_type(
+        (ServerError, ServiceUnavailable, ResourceExhausted, ConnectionError)
+    ),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    stop=stop_after_attempt(4),
+    reraise=True,
+)
+
+# On-disk cache for GA4 report slices covering fully-finalized date
+# ranges. Data for yesterday and older never changes, so repeated
+# "last N days" pulls only need a live request for today.
+_GA4_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'votegtr', 'ga4')
+
+# How long a realtime-users response stays fresh for dashboard polls
+_REALTIME_TTL_SECONDS = 30
+
+
+def _cache_get(key: str):
+    """Load a cached result, or None on miss/corruption"""
+    try:
+        with open(os.path.join(_GA4_CACHE_DIR, key), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+
+
+def _cache_put(key: str, value) -> None:
+    """Store a result; cache failures are never fatal"""
+    try:
+        os.makedirs(_GA4_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(_GA4_CACHE_DIR, key), 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+
+# Tracked funnel events with fixed integer ids: 0-3 are user journey
+# stages, 4-7 are conversion events. The parse loop does one dict probe
+# and two array writes per row instead of nested dict mutations.
+_FUNNEL_EVENT_IDS = {
+    'session_start': 0,
+    'page_view': 1,
+    'user_engagement': 2,
+    'click': 3,
+    'form_submit': 4,
+    'LP_TY_Page_Conv': 5,
+    'sign_up__learning_': 6,
+    'purchase_completed': 7,
+}
+
+# Display labels indexed by event id (order matters for funnel progression)
+_FUNNEL_STAGE_EVENTS = ('session_start', 'page_view', 'user_engagement', 'click')
+_FUNNEL_STAGE_LABELS = ('Site Visit', 'Content View', 'Engaged Session', 'Interaction')
+_CONVERSION_EVENTS = ('form_submit', 'LP_TY_Page_Conv', 'sign_up__learning_', 'purchase_completed')
+_CONVERSION_LABELS = ('Form Submission', 'Landing Page Conversion', 'Learning Center Signup', 'Purchase')
+
 
 class GA4Client:
     """Client for interacting with GA4 API"""
-    
+
+    _SCOPES = ('https://www.googleapis.com/auth/analytics.readonly',)
+
+    # Class-level caches keyed on (credentials_path, scopes): parsing the
+    # service-account key and standing up the gRPC channel are paid once,
+    # and clients for multiple properties multiplex one connection
+    _creds_cache: Dict = {}
+    _client_cache: Dict = {}
+
+    @classmethod
+    def _get_credentials(cls, path: str, scopes: tuple):
+        key = (path, scopes)
+        creds = cls._creds_cache.get(key)
+        if creds is None:
+            creds = cls._creds_cache[key] = service_account.Credentials.from_service_account_file(
+                path, scopes=list(scopes)
+            )
+        return creds
+
+    @classmethod
+    def _get_client(cls, path: str, scopes: tuple):
+        key = (path, scopes)
+        client = cls._client_cache.get(key)
+        if client is None:
+            credentials = cls._get_credentials(path, scopes)
+            # Explicit channel with keepalive so every report call -
+            # including the threaded fan-outs in collect_all -
+            # multiplexes over one long-lived HTTP/2 connection instead
+            # of renegotiating TLS
+            channel = BetaAnalyticsDataGrpcTransport.create_channel(
+                credentials=credentials,
+                options=[
+                    ('grpc.keepalive_time_ms', 30000),
+                    ('grpc.keepalive_timeout_ms', 10000),
+                    ('grpc.http2.max_pings_without_data', 0),
+                ],
+            )
+            transport = BetaAnalyticsDataGrpcTransport(credentials=credentials, channel=channel)
+            client = cls._client_cache[key] = BetaAnalyticsDataClient(transport=transport)
+
+        return client
+
     def __init__(self, property_id: Optional[str] = None):
         """
         Initialize GA4 client
@@ -34,6 +134,30 @@ class GA4Client:
         Args:
             property_id: GA4 property ID (optional, can use env var)
         """
+        # Deferred SDK import: importing this module stays cheap for
+        # consumers that never construct a client (e.g. alert-only runs);
+        # the Google SDK (~200 ms, ~15 MB) loads on first instantiation
+        global BetaAnalyticsDataClient, BetaAnalyticsDataGrpcTransport, \
+            BatchRunReportsRequest, RunReportRequest, \
+            RunRealtimeReportRequest, DateRange, Dimension, Metric, OrderBy, \
+            FilterExpression, Filter, service_account
+        from google.analytics.data_v1beta import BetaAnalyticsDataClient
+        from google.analytics.data_v1beta.services.beta_analytics_data.transports.grpc import (
+            BetaAnalyticsDataGrpcTransport
+        )
+        from google.analytics.data_v1beta.types import (
+            BatchRunReportsRequest,
+            RunReportRequest,
+            RunRealtimeReportRequest,
+            DateRange,
+            Dimension,
+            Metric,
+            OrderBy,
+            FilterExpression,
+            Filter
+        )
+        from google.oauth2 import service_account
+
         self.property_id = property_id or os.getenv('GA4_PROPERTY_ID')
         if not self.property_id:
             raise ValueError("GA4_PROPERTY_ID not found in environment or parameters")
@@ -43,21 +167,87 @@ class GA4Client:
         if not credentials_path:
             raise ValueError("GOOGLE_APPLICATION_CREDENTIALS not found in environment")
         
-        credentials = service_account.Credentials.from_service_account_file(
-            credentials_path,
-            scopes=['https://www.googleapis.com/auth/analytics.readonly']
-        )
-        
-        self.client = BetaAnalyticsDataClient(credentials=credentials)
+        self.client = self._get_client(credentials_path, self._SCOPES)
+
+        # Realtime response cache (see get_real_time_users)
+        self._rt_cache: Optional[Dict] = None
+        self._rt_cache_ts = 0.0
+
         print(f"✅ GA4 Client initialized for property: {self.property_id}")
     
-    def get_funnel_metrics(self, start_date: str = '7daysAgo', end_date: str = 'today') -> Dict:
+    @_retry_transient
+    def batch_reports(self, requests: List[RunReportRequest]) -> List:
         """
-        Get funnel metrics - separates user journey stages from conversion events
+        Run up to five report requests in a single API round-trip
 
-        Returns dict with funnel_stages and conversions separated
+        Args:
+            requests: RunReportRequest instances (max 5 per GA4 limits)
+
+        Returns:
+            List of report responses, in request order
         """
-        request = RunReportRequest(
+        batch = BatchRunReportsRequest(
+            property=f"properties/{self.property_id}",
+            requests=requests
+        )
+
+        response = self.client.batch_run_reports(batch)
+        return list(response.reports)
+
+    def get_all_daily(self, days: int = 7,
+                      start_date: str = '7daysAgo', end_date: str = 'today') -> Dict:
+        """
+        Fetch daily metrics, funnel, attribution and top pages in one
+        batched API call instead of four sequential round-trips
+
+        Returns:
+            Dict with 'daily_metrics', 'funnel', 'attribution', 'top_pages'
+        """
+        requests = [
+            self._build_daily_metrics_request(
+                (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+            ),
+            self._build_funnel_request(start_date, end_date),
+            self._build_attribution_request(start_date, end_date),
+            self._build_top_pages_request(start_date, end_date, 10),
+        ]
+
+        daily, funnel, attribution, top_pages = self.batch_reports(requests)
+
+        return {
+            'daily_metrics': self._parse_daily_metrics_response(daily, days),
+            'funnel': self._parse_funnel_response(funnel, start_date, end_date),
+            'attribution': self._parse_attribution_response(attribution, start_date, end_date),
+            'top_pages': self._parse_top_pages_response(top_pages)
+        }
+
+    def collect_all(self, days: int = 7,
+                    start_date: str = '7daysAgo', end_date: str = 'today') -> Dict:
+        """
+        Collect every GA4 dataset the report pipeline needs concurrently.
+
+        The batched reports, the realtime snapshot and the data-quality
+        check are independent network calls, so total latency is the
+        slowest of the three instead of their sum.
+
+        Returns:
+            Dict with 'daily_metrics', 'funnel', 'attribution',
+            'top_pages', 'realtime' and 'data_quality'
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            reports_future = executor.submit(self.get_all_daily, days, start_date, end_date)
+            realtime_future = executor.submit(self.get_real_time_users)
+            quality_future = executor.submit(self.check_data_quality)
+
+            results = reports_future.result()
+            results['realtime'] = realtime_future.result()
+            results['data_quality'] = quality_future.result()
+
+        return results
+
+    def _build_funnel_request(self, start_date: str, end_date: str) -> RunReportRequest:
+        """Build the funnel metrics report request"""
+        return RunReportRequest(
             property=f"properties/{self.property_id}",
             dimensions=[Dimension(name="eventName")],
             metrics=[
@@ -67,81 +257,63 @@ class GA4Client:
             date_ranges=[DateRange(start_date=start_date, end_date=end_date)]
         )
 
-        response = self.client.run_report(request)
-
-        # Define funnel stages (user journey)
-        funnel_stages = {
-            'session_start': {'stage': 'Site Visit', 'count': 0, 'users': 0},
-            'page_view': {'stage': 'Content View', 'count': 0, 'users': 0},
-            'user_engagement': {'stage': 'Engaged Session', 'count': 0, 'users': 0},
-            'click': {'stage': 'Interaction', 'count': 0, 'users': 0}
-        }
-
-        # Define conversion events (goals achieved)
-        conversion_events = {
-            'form_submit': {'type': 'Form Submission', 'count': 0, 'users': 0},
-            'LP_TY_Page_Conv': {'type': 'Landing Page Conversion', 'count': 0, 'users': 0},
-            'sign_up__learning_': {'type': 'Learning Center Signup', 'count': 0, 'users': 0},
-            'purchase_completed': {'type': 'Purchase', 'count': 0, 'users': 0}
-        }
+    def _parse_funnel_response(self, response, start_date: str, end_date: str) -> Dict:
+        """Parse a funnel report response into stage/conversion dicts"""
+        # Accumulate counts/users into flat arrays indexed by event id -
+        # one dict probe per row, no per-row dict writes
+        counts = np.zeros(len(_FUNNEL_EVENT_IDS), dtype=np.int64)
+        users = np.zeros(len(_FUNNEL_EVENT_IDS), dtype=np.int64)
 
-        # Parse response and populate both dictionaries
+        get_id = _FUNNEL_EVENT_IDS.get
         for row in response.rows:
-            event_name = row.dimension_values[0].value
-            event_count = int(row.metric_values[0].value)
-            user_count = int(row.metric_values[1].value)
-
-            if event_name in funnel_stages:
-                funnel_stages[event_name]['count'] = event_count
-                funnel_stages[event_name]['users'] = user_count
-            elif event_name in conversion_events:
-                conversion_events[event_name]['count'] = event_count
-                conversion_events[event_name]['users'] = user_count
+            idx = get_id(row.dimension_values[0].value)
+            if idx is not None:
+                counts[idx] += int(row.metric_values[0].value)
+                users[idx] += int(row.metric_values[1].value)
 
         # Build funnel stages list with progression rates
         stages_list = []
         previous_count = None
 
-        # Order matters for funnel progression
-        ordered_stages = ['session_start', 'page_view', 'user_engagement', 'click']
-
-        for event_name in ordered_stages:
-            data = funnel_stages[event_name]
-            if data['count'] > 0:
+        for idx, event_name in enumerate(_FUNNEL_STAGE_EVENTS):
+            count = int(counts[idx])
+            if count > 0:
                 stage_data = {
                     'event': event_name,
-                    'stage': data['stage'],
-                    'count': data['count'],
-                    'users': data['users']
+                    'stage': _FUNNEL_STAGE_LABELS[idx],
+                    'count': count,
+                    'users': int(users[idx])
                 }
 
                 # Calculate progression rate from previous stage
                 if previous_count is not None and previous_count > 0:
-                    stage_data['progression_rate'] = round((data['count'] / previous_count) * 100, 1)
+                    stage_data['progression_rate'] = round((count / previous_count) * 100, 1)
                     stage_data['drop_off_rate'] = round(100 - stage_data['progression_rate'], 1)
                 else:
                     stage_data['progression_rate'] = 100.0
                     stage_data['drop_off_rate'] = 0.0
 
                 stages_list.append(stage_data)
-                previous_count = data['count']
+                previous_count = count
 
-        # Build conversions list
+        # Build conversions list (ids 4+ in the event map)
         conversions_list = []
-        total_conversions = 0
+        offset = len(_FUNNEL_STAGE_EVENTS)
 
-        for event_name, data in conversion_events.items():
-            if data['count'] > 0:
+        for i, event_name in enumerate(_CONVERSION_EVENTS):
+            count = int(counts[offset + i])
+            if count > 0:
                 conversions_list.append({
                     'event': event_name,
-                    'type': data['type'],
-                    'count': data['count'],
-                    'users': data['users']
+                    'type': _CONVERSION_LABELS[i],
+                    'count': count,
+                    'users': int(users[offset + i])
                 })
-                total_conversions += data['count']
+
+        total_conversions = int(counts[offset:].sum())
 
         # Calculate overall conversion rate
-        total_sessions = funnel_stages['session_start']['count'] if funnel_stages['session_start']['count'] > 0 else 0
+        total_sessions = int(counts[_FUNNEL_EVENT_IDS['session_start']])
         conversion_rate = round((total_conversions / total_sessions * 100), 2) if total_sessions > 0 else 0
 
         return {
@@ -154,12 +326,20 @@ class GA4Client:
             'date_range': f"{start_date} to {end_date}",
             'total_sessions': total_sessions
         }
-    
-    def get_attribution_data(self, start_date: str = '7daysAgo', end_date: str = 'today') -> Dict:
+
+    @_retry_transient
+    def get_funnel_metrics(self, start_date: str = '7daysAgo', end_date: str = 'today') -> Dict:
         """
-        Get attribution data showing traffic sources and conversion paths
+        Get funnel metrics - separates user journey stages from conversion events
+
+        Returns dict with funnel_stages and conversions separated
         """
-        request = RunReportRequest(
+        response = self.client.run_report(self._build_funnel_request(start_date, end_date))
+        return self._parse_funnel_response(response, start_date, end_date)
+
+    def _build_attribution_request(self, start_date: str, end_date: str) -> RunReportRequest:
+        """Build the attribution report request"""
+        return RunReportRequest(
             property=f"properties/{self.property_id}",
             dimensions=[
                 Dimension(name="sessionSource"),
@@ -181,54 +361,90 @@ class GA4Client:
             ],
             limit=20
         )
-        
-        response = self.client.run_report(request)
-        
-        attribution_data = []
-        total_conversions = 0
-        
-        for row in response.rows:
-            source = row.dimension_values[0].value or '(not set)'
-            medium = row.dimension_values[1].value or '(not set)'
-            campaign = row.dimension_values[2].value or '(not set)'
-            
-            sessions = int(row.metric_values[0].value)
-            users = int(row.metric_values[1].value)
-            conversions = int(row.metric_values[2].value)
-            page_views = int(row.metric_values[3].value)
-            
-            total_conversions += conversions
-            
-            attribution_data.append({
-                'source': source,
-                'medium': medium,
-                'campaign': campaign,
-                'channel': f"{source}/{medium}",
-                'sessions': sessions,
-                'users': users,
-                'conversions': conversions,
-                'page_views': page_views,
-                'conversion_rate': (conversions / sessions * 100) if sessions > 0 else 0,
-                'pages_per_session': page_views / sessions if sessions > 0 else 0
-            })
-        
-        # Calculate UTM coverage
-        utm_sessions = sum(d['sessions'] for d in attribution_data 
-                          if d['source'] != '(not set)' and d['source'] != '(direct)')
-        total_sessions = sum(d['sessions'] for d in attribution_data)
+
+    def _parse_attribution_response(self, response, start_date: str, end_date: str) -> Dict:
+        """Parse an attribution report response into the channels dict"""
+        # Drain the proto rows column-wise (structure of arrays): one
+        # comprehension per field, then vectorized math, instead of five
+        # dotted proto accesses plus divisions per row
+        rows = response.rows
+        n = len(rows)
+
+        sources = [r.dimension_values[0].value or '(not set)' for r in rows]
+        mediums = [r.dimension_values[1].value or '(not set)' for r in rows]
+        campaigns = [r.dimension_values[2].value or '(not set)' for r in rows]
+
+        sessions = np.fromiter((int(r.metric_values[0].value) for r in rows), dtype=np.int64, count=n)
+        users = np.fromiter((int(r.metric_values[1].value) for r in rows), dtype=np.int64, count=n)
+        conversions = np.fromiter((int(r.metric_values[2].value) for r in rows), dtype=np.int64, count=n)
+        page_views = np.fromiter((int(r.metric_values[3].value) for r in rows), dtype=np.int64, count=n)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            conversion_rates = np.where(sessions > 0, conversions / sessions * 100, 0.0)
+            pages_per_session = np.where(sessions > 0, page_views / sessions, 0.0)
+
+        attribution_data = [
+            {
+                'source': sources[i],
+                'medium': mediums[i],
+                'campaign': campaigns[i],
+                'channel': f"{sources[i]}/{mediums[i]}",
+                'sessions': int(sessions[i]),
+                'users': int(users[i]),
+                'conversions': int(conversions[i]),
+                'page_views': int(page_views[i]),
+                'conversion_rate': float(conversion_rates[i]),
+                'pages_per_session': float(pages_per_session[i])
+            }
+            for i in range(n)
+        ]
+
+        # Calculate UTM coverage from the session column via a mask
+        # instead of another Python pass over the channel dicts
+        utm_mask = np.fromiter(
+            (src != '(not set)' and src != '(direct)' for src in sources),
+            dtype=bool, count=n
+        )
+        utm_sessions = int(sessions[utm_mask].sum())
+        total_sessions = int(sessions.sum())
         utm_coverage = (utm_sessions / total_sessions * 100) if total_sessions > 0 else 0
-        
+
         return {
             'channels': attribution_data,
-            'total_conversions': total_conversions,
+            'total_conversions': int(conversions.sum()),
             'utm_coverage': utm_coverage,
             'date_range': f"{start_date} to {end_date}"
         }
-    
+
+    @_retry_transient
+    def get_attribution_data(self, start_date: str = '7daysAgo', end_date: str = 'today') -> Dict:
+        """
+        Get attribution data showing traffic sources and conversion paths
+        """
+        response = self.client.run_report(self._build_attribution_request(start_date, end_date))
+        return self._parse_attribution_response(response, start_date, end_date)
+
     def get_real_time_users(self) -> Dict:
         """
         Get real-time active users on the site
+
+        Responses are reused for 30 seconds: the Realtime API has a hard
+        per-property quota, and dashboard poll bursts within a window all
+        see the same data anyway.
         """
+        now = time.monotonic()
+        if self._rt_cache is not None and now - self._rt_cache_ts < _REALTIME_TTL_SECONDS:
+            return self._rt_cache
+
+        result = self._fetch_realtime()
+        self._rt_cache = result
+        self._rt_cache_ts = now
+
+        return result
+
+    @_retry_transient
+    def _fetch_realtime(self) -> Dict:
+        """Run the realtime report and aggregate the breakdowns"""
         request = RunRealtimeReportRequest(
             property=f"properties/{self.property_id}",
             dimensions=[
@@ -244,38 +460,39 @@ class GA4Client:
         response = self.client.run_realtime_report(request)
         
         total_users = 0
-        by_country = {}
-        by_device = {}
-        by_page = {}
-        
+        by_country = defaultdict(int)
+        by_device = defaultdict(int)
+        by_page = defaultdict(int)
+
         for row in response.rows:
             country = row.dimension_values[0].value
             device = row.dimension_values[1].value
             page = row.dimension_values[2].value
             users = int(row.metric_values[0].value)
-            
+
             total_users += users
-            
-            by_country[country] = by_country.get(country, 0) + users
-            by_device[device] = by_device.get(device, 0) + users
-            by_page[page] = by_page.get(page, 0) + users
-        
+
+            by_country[country] += users
+            by_device[device] += users
+            by_page[page] += users
+
+        # Top-5 via nlargest: O(N log 5) instead of a full sort per dict
         return {
             'total_active_users': total_users,
-            'by_country': dict(sorted(by_country.items(), key=lambda x: x[1], reverse=True)[:5]),
-            'by_device': by_device,
-            'by_page': dict(sorted(by_page.items(), key=lambda x: x[1], reverse=True)[:5]),
+            'by_country': dict(heapq.nlargest(5, by_country.items(), key=itemgetter(1))),
+            'by_device': dict(by_device),
+            'by_page': dict(heapq.nlargest(5, by_page.items(), key=itemgetter(1))),
             'timestamp': datetime.now().isoformat()
         }
     
-    def get_daily_metrics(self, days: int = 7) -> Dict:
-        """
-        Get daily metrics for the past N days
-        """
-        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-        end_date = 'today'
-        
-        request = RunReportRequest(
+    def _cache_key(self, method: str, *parts: str) -> str:
+        """Hash a (property, method, date range) tuple into a cache filename"""
+        raw = '|'.join((self.property_id, method) + parts)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _build_daily_metrics_request(self, start_date: str, end_date: str = 'today') -> RunReportRequest:
+        """Build the daily metrics report request"""
+        return RunReportRequest(
             property=f"properties/{self.property_id}",
             dimensions=[Dimension(name="date")],
             metrics=[
@@ -294,9 +511,9 @@ class GA4Client:
                 )
             ]
         )
-        
-        response = self.client.run_report(request)
-        
+
+    def _parse_daily_rows(self, response) -> List[Dict]:
+        """Extract per-day metric rows from a daily report response"""
         daily_data = []
         for row in response.rows:
             date = row.dimension_values[0].value
@@ -309,27 +526,111 @@ class GA4Client:
                 'bounce_rate': float(row.metric_values[4].value) * 100,
                 'conversions': int(row.metric_values[5].value)
             })
-        
-        # Calculate totals
-        totals = {
-            'total_users': sum(d['users'] for d in daily_data),
-            'total_sessions': sum(d['sessions'] for d in daily_data),
-            'total_page_views': sum(d['page_views'] for d in daily_data),
-            'total_conversions': sum(d['conversions'] for d in daily_data),
-            'avg_bounce_rate': sum(d['bounce_rate'] for d in daily_data) / len(daily_data) if daily_data else 0
+
+        return daily_data
+
+    @staticmethod
+    def _daily_totals(daily_data: List[Dict]) -> Dict:
+        """Aggregate per-day rows into period totals via array reductions"""
+        n = len(daily_data)
+        if not n:
+            return {
+                'total_users': 0,
+                'total_sessions': 0,
+                'total_page_views': 0,
+                'total_conversions': 0,
+                'avg_bounce_rate': 0
+            }
+
+        users = np.fromiter((d['users'] for d in daily_data), np.int64, n)
+        sessions = np.fromiter((d['sessions'] for d in daily_data), np.int64, n)
+        page_views = np.fromiter((d['page_views'] for d in daily_data), np.int64, n)
+        conversions = np.fromiter((d['conversions'] for d in daily_data), np.int64, n)
+        bounce_rates = np.fromiter((d['bounce_rate'] for d in daily_data), np.float64, n)
+
+        return {
+            'total_users': int(users.sum()),
+            'total_sessions': int(sessions.sum()),
+            'total_page_views': int(page_views.sum()),
+            'total_conversions': int(conversions.sum()),
+            'avg_bounce_rate': float(bounce_rates.mean())
         }
-        
+
+    def _parse_daily_metrics_response(self, response, days: int) -> Dict:
+        """Parse a daily metrics report response into per-day rows + totals"""
+        daily_data = self._parse_daily_rows(response)
+
         return {
             'daily_metrics': daily_data,
-            'totals': totals,
+            'totals': self._daily_totals(daily_data),
             'period': f"Last {days} days"
         }
-    
-    def get_top_pages(self, start_date: str = '7daysAgo', end_date: str = 'today', limit: int = 10) -> List[Dict]:
+
+    @_retry_transient
+    def get_daily_metrics(self, days: int = 7) -> Dict:
         """
-        Get top performing pages
+        Get daily metrics for the past N days
+
+        The whole range comes back from a single report request with
+        date as a dimension - one HTTP round-trip regardless of N.
+        Days before today are finalized in GA4, so that slice is served
+        from the on-disk cache when available and only today's partial
+        day is fetched live.
         """
-        request = RunReportRequest(
+        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+        if yesterday < start_date:
+            # Window is just today - nothing cacheable
+            response = self.client.run_report(self._build_daily_metrics_request(start_date))
+            return self._parse_daily_metrics_response(response, days)
+
+        # Finalized days are cached individually rather than as one
+        # (start, end) blob: the daily cron's window slides one day per
+        # run, so a whole-range key never hits across days while 13/14
+        # of the rows are identical. Per-day keys turn each run into a
+        # fetch of only the dates not yet on disk - normally just one.
+        rows_by_date = {}
+        missing = []
+        day = datetime.strptime(start_date, '%Y-%m-%d')
+        last = datetime.strptime(yesterday, '%Y-%m-%d')
+        while day <= last:
+            date_iso = day.strftime('%Y-%m-%d')
+            row = _cache_get(self._cache_key('daily_metrics_day', date_iso))
+            if row is None:
+                missing.append(date_iso)
+            else:
+                rows_by_date[row['date']] = row
+            day += timedelta(days=1)
+
+        if missing:
+            # One request spanning the missing dates; any cached days it
+            # overlaps just get refreshed in place
+            response = self.client.run_report(
+                self._build_daily_metrics_request(missing[0], missing[-1])
+            )
+            for row in self._parse_daily_rows(response):
+                date_iso = f"{row['date'][:4]}-{row['date'][4:6]}-{row['date'][6:]}"
+                _cache_put(self._cache_key('daily_metrics_day', date_iso), row)
+                rows_by_date[row['date']] = row
+
+        historical = [rows_by_date[d] for d in sorted(rows_by_date)]
+
+        # Today is still accumulating - always fetch live
+        live_response = self.client.run_report(
+            self._build_daily_metrics_request('today', 'today')
+        )
+        daily_data = historical + self._parse_daily_rows(live_response)
+
+        return {
+            'daily_metrics': daily_data,
+            'totals': self._daily_totals(daily_data),
+            'period': f"Last {days} days"
+        }
+
+    def _build_top_pages_request(self, start_date: str, end_date: str, limit: int) -> RunReportRequest:
+        """Build the top pages report request"""
+        return RunReportRequest(
             property=f"properties/{self.property_id}",
             dimensions=[
                 Dimension(name="pagePath"),
@@ -350,9 +651,9 @@ class GA4Client:
             ],
             limit=limit
         )
-        
-        response = self.client.run_report(request)
-        
+
+    def _parse_top_pages_response(self, response) -> List[Dict]:
+        """Parse a top pages report response into page dicts"""
         pages = []
         for row in response.rows:
             pages.append({
@@ -363,9 +664,18 @@ class GA4Client:
                 'avg_time': float(row.metric_values[2].value),
                 'bounce_rate': float(row.metric_values[3].value) * 100
             })
-        
+
         return pages
-    
+
+    @_retry_transient
+    def get_top_pages(self, start_date: str = '7daysAgo', end_date: str = 'today', limit: int = 10) -> List[Dict]:
+        """
+        Get top performing pages
+        """
+        response = self.client.run_report(self._build_top_pages_request(start_date, end_date, limit))
+        return self._parse_top_pages_response(response)
+
+    @_retry_transient
     def check_data_quality(self) -> Dict:
         """
         Check data quality and identify issues
@@ -404,15 +714,8 @@ class GA4Client:
         
         missing_events = [e for e in expected_events if e not in found_events]
         attribution_rate = ((total_events - unattributed_count) / total_events * 100) if total_events > 0 else 0
-        
-        return {
-            'status': 'healthy' if not missing_events and attribution_rate > 75 else 'warning',
-            'missing_events': missing_events,
-            'attribution_rate': attribution_rate,
-            'total_events_24h': total_events,
-            'issues': []
-        }
-        
+
+        issues = []
         if missing_events:
             issues.append(f"Missing events: {', '.join(missing_events)}")
         if attribution_rate < 75:
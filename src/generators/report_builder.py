@@ -3,45 +3,52 @@ Report Builder
 Converts markdown to HTML and manages report storage
 """
 
+import json
+import mmap
 import os
+import re
+import tempfile
 from datetime import datetime
 from pathlib import Path
-import markdown
+import cmarkgfm
+import xxhash
+from cmarkgfm.cmark import Options as cmarkgfmOptions
 
-class ReportBuilder:
-    """Builds and saves weekly reports"""
-
-    def __init__(self):
-        self.analysis_dir = Path('analysis')
-        self.analysis_dir.mkdir(exist_ok=True)
-        print("✅ Report Builder initialized")
+# Section boundaries for the render cache: split ahead of each heading
+# line. Headings reset parser context, so sections render independently
+# to the same HTML as one full-document pass (unlike blank-line splits,
+# which would tear loose lists apart). Splitting is fence-aware - a
+# "# comment" line inside a ``` block is code, not a heading, and
+# breaking there would leave both halves with torn fences.
+_RE_HEADING = re.compile(r'#{1,6} ')
+_RE_FENCE = re.compile(r' {0,3}(`{3,}|~{3,})')
 
-    def markdown_to_html(self, markdown_text: str, metadata: dict) -> str:
-        """
-        Convert markdown analysis to HTML email
 
-        Args:
-            markdown_text: AI-generated markdown
-            metadata: Report metadata (date range, etc.)
+def _split_sections(markdown_text: str) -> list:
+    """Split markdown ahead of headings that sit outside code fences"""
+    sections = []
+    current = []
+    fence = None
+    for line in markdown_text.splitlines(keepends=True):
+        fence_match = _RE_FENCE.match(line)
+        if fence is None and fence_match:
+            fence = fence_match.group(1)[0]
+        elif fence is not None:
+            if fence_match and fence_match.group(1)[0] == fence:
+                fence = None
+        elif current and line.startswith('#') and _RE_HEADING.match(line):
+            sections.append(''.join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append(''.join(current))
+    return sections
 
-        Returns:
-            HTML string
-        """
-        # Convert markdown to HTML
-        html_body = markdown.markdown(
-            markdown_text,
-            extensions=['tables', 'fenced_code', 'nl2br']
-        )
-
-        # Wrap in email template
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>VOTEGTR Weekly Analytics - {metadata.get('date_range')}</title>
-    <style>
-        body {{
+# The CSS never changes between reports, so it lives in a plain string
+# (no doubled braces, no placeholder parsing) and is fused into the
+# static HTML segments below once at import
+_CSS = """
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             line-height: 1.6;
             color: #333;
@@ -49,91 +56,168 @@ class ReportBuilder:
             margin: 0 auto;
             padding: 20px;
             background: #f5f5f5;
-        }}
-        h1 {{
+        }
+        h1 {
             color: #667eea;
             border-bottom: 3px solid #764ba2;
             padding-bottom: 10px;
-        }}
-        h2 {{
+        }
+        h2 {
             color: #764ba2;
             border-bottom: 2px solid #667eea;
             padding-bottom: 8px;
             margin-top: 30px;
-        }}
-        h3 {{
+        }
+        h3 {
             color: #555;
             margin-top: 20px;
-        }}
-        table {{
+        }
+        table {
             border-collapse: collapse;
             width: 100%;
             margin: 20px 0;
             background: white;
-        }}
-        th, td {{
+        }
+        th, td {
             border: 1px solid #ddd;
             padding: 12px;
             text-align: left;
-        }}
-        th {{
+        }
+        th {
             background: #667eea;
             color: white;
             font-weight: 600;
-        }}
-        tr:nth-child(even) {{
+        }
+        tr:nth-child(even) {
             background: #f9f9f9;
-        }}
-        code {{
+        }
+        code {
             background: #f4f4f4;
             padding: 2px 6px;
             border-radius: 3px;
             font-family: 'Courier New', monospace;
-        }}
-        pre {{
+        }
+        pre {
             background: #f4f4f4;
             padding: 15px;
             border-radius: 5px;
             overflow-x: auto;
-        }}
-        .metric-box {{
+        }
+        .metric-box {
             background: white;
             padding: 20px;
             margin: 10px 0;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .highlight {{
+        }
+        .highlight {
             background: #fff3cd;
             padding: 15px;
             border-left: 4px solid #ffc107;
             margin: 15px 0;
-        }}
-        strong {{
+        }
+        strong {
             color: #667eea;
-        }}
-        ul, ol {{
+        }
+        ul, ol {
             padding-left: 25px;
-        }}
-        li {{
+        }
+        li {
             margin: 8px 0;
-        }}
-    </style>
+        }
+"""
+
+# Static HTML segments around the two variable slots (date range in the
+# title/footer and the rendered body). Rendering is a join over these
+# constants - one memcpy per segment, no template parsing per call.
+_HTML_BEFORE_TITLE_DATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>VOTEGTR Weekly Analytics - """
+
+_HTML_BEFORE_BODY = """</title>
+    <style>""" + _CSS + """    </style>
 </head>
 <body>
     <div class="metric-box">
-        {html_body}
+        """
+
+_HTML_BEFORE_FOOTER_DATE = """
     </div>
     <footer style="text-align: center; margin-top: 40px; padding: 20px; color: #666; border-top: 1px solid #ddd;">
         <p><strong>VOTEGTR Analytics</strong> | Generated with Claude AI</p>
         <p style="font-size: 0.9em;">Business context from <a href="https://github.com/SPMStrategies/votegtr-vault" style="color: #667eea;">votegtr-vault</a></p>
-        <p style="font-size: 0.8em;">Report Period: {metadata.get('date_range')}</p>
+        <p style="font-size: 0.8em;">Report Period: """
+
+_HTML_TAIL = """</p>
     </footer>
 </body>
 </html>
 """
 
-        return html
+
+class ReportBuilder:
+    """Builds and saves weekly reports"""
+
+    def __init__(self):
+        self.analysis_dir = Path('analysis')
+        self.analysis_dir.mkdir(exist_ok=True)
+
+        # Per-section render cache, persisted so iterative pipeline runs
+        # only re-render the sections the LLM actually changed
+        self._chunk_cache_file = self.analysis_dir / '.md_html_cache.json'
+        try:
+            self._html_chunk_cache = json.loads(
+                self._chunk_cache_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self._html_chunk_cache = {}
+
+        print("✅ Report Builder initialized")
+
+    def markdown_to_html(self, markdown_text: str, metadata: dict) -> str:
+        """
+        Convert markdown analysis to HTML email
+
+        Args:
+            markdown_text: AI-generated markdown
+            metadata: Report metadata (date range, etc.)
+
+        Returns:
+            HTML string
+        """
+        # Convert markdown to HTML via the cmark C extension; GFM covers
+        # tables and fenced code natively, HARDBREAKS keeps the old nl2br
+        # behaviour. Sections are rendered individually and cached by
+        # content hash, so regenerating a mostly-unchanged analysis only
+        # pays for the sections that differ.
+        parts = []
+        rendered_new = False
+        for section in _split_sections(markdown_text):
+            key = xxhash.xxh3_64_hexdigest(section)
+            section_html = self._html_chunk_cache.get(key)
+            if section_html is None:
+                section_html = cmarkgfm.github_flavored_markdown_to_html(
+                    section,
+                    options=cmarkgfmOptions.CMARK_OPT_HARDBREAKS
+                )
+                self._html_chunk_cache[key] = section_html
+                rendered_new = True
+            parts.append(section_html)
+
+        html_body = ''.join(parts)
+        if rendered_new:
+            self._save_chunk_cache()
+
+        # Stitch the static segments around the two variable slots
+        date_range = str(metadata.get('date_range'))
+        return ''.join((
+            _HTML_BEFORE_TITLE_DATE, date_range,
+            _HTML_BEFORE_BODY, html_body,
+            _HTML_BEFORE_FOOTER_DATE, date_range,
+            _HTML_TAIL,
+        ))
 
     def save_report(self, markdown: str, html: str, date: str):
         """
@@ -144,16 +228,79 @@ class ReportBuilder:
             html: HTML report
             date: Report date (YYYY-MM-DD)
         """
-        # Save markdown
+        # Stage-then-rename so a crash mid-write never leaves a truncated
+        # report where the email/dashboard steps expect a complete one
         md_file = self.analysis_dir / f"{date}-weekly-analysis.md"
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(markdown)
+        self._write_atomic(md_file, markdown)
         print(f"  ✓ Saved markdown: {md_file}")
 
-        # Save HTML
         html_file = self.analysis_dir / f"{date}-weekly-analysis.html"
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html)
+        self._write_atomic(html_file, html)
         print(f"  ✓ Saved HTML: {html_file}")
 
         return str(md_file), str(html_file)
+
+    def _save_chunk_cache(self):
+        """Persist the section render cache, pruned to a sane size"""
+        if len(self._html_chunk_cache) > 512:
+            # Keep the most recently added half; stale sections from old
+            # report iterations just re-render on demand
+            items = list(self._html_chunk_cache.items())
+            self._html_chunk_cache = dict(items[len(items) // 2:])
+        try:
+            self._chunk_cache_file.write_text(
+                json.dumps(self._html_chunk_cache), encoding='utf-8')
+        except OSError:
+            pass  # cache is an optimization; never fail the report for it
+
+    def _write_atomic(self, path: Path, text: str):
+        """Write text to path via a same-directory temp file + rename"""
+        # Temp file lives in analysis/ so os.replace stays a same-
+        # filesystem rename - atomic, and readers only ever see the old
+        # file or the complete new one
+        data = text.encode('utf-8')
+        fd, tmp_name = tempfile.mkstemp(dir=self.analysis_dir, suffix='.tmp')
+        try:
+            try:
+                if len(data) > 64 * 1024:
+                    # Large report: size the file up front and fill it
+                    # through a mapping, writing straight into the page
+                    # cache instead of through the write() copy path
+                    os.ftruncate(fd, len(data))
+                    with mmap.mmap(fd, len(data)) as mm:
+                        mm[:] = data
+                else:
+                    os.write(fd, data)
+            finally:
+                os.close(fd)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def save_reports_batch(self, reports: list) -> list:
+        """
+        Save many reports in one pass (backfills)
+
+        Args:
+            reports: List of (markdown, html, date) tuples
+
+        Returns:
+            List of (md_path, html_path) tuples
+        """
+        # Plain single-shot writes here: the OS coalesces the directory
+        # updates, and per-file atomicity matters less for a backfill
+        # that is re-runnable end to end
+        paths = []
+        for markdown, html, date in reports:
+            md_file = self.analysis_dir / f"{date}-weekly-analysis.md"
+            md_file.write_text(markdown, encoding='utf-8')
+            html_file = self.analysis_dir / f"{date}-weekly-analysis.html"
+            html_file.write_text(html, encoding='utf-8')
+            paths.append((str(md_file), str(html_file)))
+
+        print(f"  ✓ Saved {len(paths)} reports to {self.analysis_dir}")
+        return paths
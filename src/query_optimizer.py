@@ -5,75 +5,175 @@ Optimizes BigQuery queries for performance and cost
 
 import os
 import json
-import hashlib
+import logging
+import re
+import sys
 import time
+import xxhash
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, NamedTuple, Optional, List, Tuple
 from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class _CacheEntry(NamedTuple):
+    """Cached query result with its monotonic expiry deadline and size"""
+    data: Any
+    expires: float
+    size: int
+
 
 class QueryCache:
     """Simple in-memory cache for query results"""
-    
-    def __init__(self, default_ttl: int = 3600):
+
+    # Adaptive-TTL tuning: refresh intervals per query pattern are
+    # tracked with an EMA, and the TTL handed out is capped near the
+    # pattern's p95 interval (~3x the mean for exponential arrivals).
+    # Past the low watermark, TTLs shrink linearly so a full cache turns
+    # entries over faster instead of growing without bound.
+    _EMA_ALPHA = 0.2
+    _TTL_FLOOR = 60
+    _PRESSURE_LOW = 6_000
+    _PRESSURE_HIGH = 8_000
+
+    def __init__(self, default_ttl: int = 3600, max_entries: int = 10_000):
         """
         Initialize query cache
-        
+
         Args:
             default_ttl: Default time-to-live in seconds (default 1 hour)
+            max_entries: Entry cap before least-recently-used eviction
         """
-        self.cache = {}
+        # Ordered by recency of use: hits move entries to the back, so
+        # the front is always the LRU candidate when over capacity
+        self.cache = OrderedDict()
         self.default_ttl = default_ttl
+        self.max_entries = max_entries
         self.hit_count = 0
         self.miss_count = 0
+        # Running payload-size estimate so get_stats never has to walk
+        # (or worse, stringify) the cached results
+        self._approx_bytes = 0
+        # Learned refresh cadence per query pattern (EMA of the interval
+        # between consecutive refreshes of the same pattern)
+        self._pattern_emas = {}
+        self._pattern_last_refresh = {}
     
     def get_cache_key(self, query: str, params: Dict = None) -> str:
         """Generate cache key from query and parameters"""
-        cache_input = query + json.dumps(params or {}, sort_keys=True)
-        return hashlib.md5(cache_input.encode()).hexdigest()
+        # No params is the common case - hash the query alone instead of
+        # serializing an empty dict on every lookup
+        if not params:
+            cache_input = query
+        else:
+            cache_input = query + json.dumps(params, sort_keys=True)
+
+        # xxh3 takes the str directly - no md5 setup or encode() copy
+        return xxhash.xxh3_64_hexdigest(cache_input)
     
     def get(self, query: str, params: Dict = None) -> Optional[Any]:
         """Get cached result if available and not expired"""
         key = self.get_cache_key(query, params)
-        
-        if key in self.cache:
-            entry = self.cache[key]
-            if datetime.now() < entry['expires']:
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry.expires > time.monotonic():
                 self.hit_count += 1
-                print(f"✅ Cache hit (rate: {self.get_hit_rate():.1f}%)")
-                return entry['data']
-            else:
-                # Expired, remove from cache
-                del self.cache[key]
-        
+                self.cache.move_to_end(key)
+                logger.debug("Cache hit (rate: %.1f%%)", self.get_hit_rate())
+                return entry.data
+            # Expired, remove from cache
+            self._approx_bytes -= entry.size
+            del self.cache[key]
+
         self.miss_count += 1
         return None
-    
+
     def set(self, query: str, data: Any, ttl: int = None, params: Dict = None):
         """Store result in cache"""
         key = self.get_cache_key(query, params)
         ttl = ttl or self.default_ttl
-        
-        self.cache[key] = {
-            'data': data,
-            'expires': datetime.now() + timedelta(seconds=ttl),
-            'query': query[:100],  # Store first 100 chars for debugging
-            'cached_at': datetime.now()
-        }
-    
+
+        old = self.cache.get(key)
+        if old is not None:
+            self._approx_bytes -= old.size
+        elif len(self.cache) >= self.max_entries:
+            # At capacity: drop the least-recently-used entry
+            _, evicted = self.cache.popitem(last=False)
+            self._approx_bytes -= evicted.size
+
+        size = sys.getsizeof(data)
+        self._approx_bytes += size
+
+        # Expiry is a monotonic deadline: float comparison on lookups,
+        # and immune to wall-clock adjustments
+        self.cache[key] = _CacheEntry(data, time.monotonic() + ttl, size)
+        self.cache.move_to_end(key)
+
+    def record_refresh(self, pattern: str):
+        """Note that a query of this pattern was just re-executed"""
+        now = time.monotonic()
+        last = self._pattern_last_refresh.get(pattern)
+        self._pattern_last_refresh[pattern] = now
+
+        if last is None:
+            return
+
+        interval = now - last
+        ema = self._pattern_emas.get(pattern)
+        self._pattern_emas[pattern] = (
+            interval if ema is None
+            else ema + self._EMA_ALPHA * (interval - ema)
+        )
+
+    def adaptive_ttl(self, pattern: str, base_ttl: int) -> int:
+        """TTL for a pattern: learned refresh cadence, capped at base_ttl"""
+        ttl = float(base_ttl)
+
+        # Pattern refreshing every few minutes? No point caching for an
+        # hour - cap near the p95 of its observed refresh interval
+        ema = self._pattern_emas.get(pattern)
+        if ema is not None:
+            ttl = min(ttl, 3.0 * ema)
+
+        # Under memory pressure, shed entries sooner instead of letting
+        # the cache grow unbounded
+        size = len(self.cache)
+        if size > self._PRESSURE_LOW:
+            pressure = min(1.0, (size - self._PRESSURE_LOW)
+                           / (self._PRESSURE_HIGH - self._PRESSURE_LOW))
+            ttl *= 1.0 - 0.9 * pressure
+
+        return max(self._TTL_FLOOR, int(ttl))
+
     def clear_expired(self):
         """Remove expired entries from cache"""
-        now = datetime.now()
-        expired_keys = [k for k, v in self.cache.items() if now >= v['expires']]
-        
-        for key in expired_keys:
-            del self.cache[key]
-        
-        if expired_keys:
-            print(f"🧹 Cleared {len(expired_keys)} expired cache entries")
+        now = time.monotonic()
+
+        # One pass, rebuilding the dict: tuple-unpacking the entry skips
+        # two attribute lookups per item, freed bytes are tallied in the
+        # same sweep, and survivors keep their recency order - cheaper
+        # than collect-then-delete once more than a few entries expire
+        survivors = OrderedDict()
+        freed = 0
+        removed = 0
+        for key, entry in self.cache.items():
+            _, expires_at, size = entry
+            if expires_at > now:
+                survivors[key] = entry
+            else:
+                freed += size
+                removed += 1
+
+        if removed:
+            self.cache = survivors
+            self._approx_bytes -= freed
+            logger.debug("Cleared %d expired cache entries", removed)
     
     def get_hit_rate(self) -> float:
         """Get cache hit rate percentage"""
@@ -89,13 +189,33 @@ class QueryCache:
             'hits': self.hit_count,
             'misses': self.miss_count,
             'hit_rate': self.get_hit_rate(),
-            'memory_estimate': sum(len(str(v)) for v in self.cache.values())
+            'memory_estimate': self._approx_bytes
         }
 
 
 class QueryOptimizer:
     """Optimizes BigQuery queries for cost and performance"""
-    
+
+    # Precompiled pattern probes: C-level case-insensitive scans instead
+    # of allocating an uppercase copy of the SQL per rule. The DATE probe
+    # stays a bare substring on purpose - a column like event_date counts
+    # as date-filtered, matching the old upper()-substring behaviour.
+    _RE_WHERE = re.compile(r'\bWHERE\b', re.IGNORECASE)
+    _RE_SELECT = re.compile(r'\bSELECT\b', re.IGNORECASE)
+    _RE_SELECT_STAR = re.compile(r'\bSELECT\s+\*', re.IGNORECASE)
+    _RE_LIMIT = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+    _RE_GROUP_BY = re.compile(r'\bGROUP\s+BY\b', re.IGNORECASE)
+    _RE_COUNT_DISTINCT = re.compile(r'\bCOUNT\s*\(\s*DISTINCT\b\s*', re.IGNORECASE)
+    _RE_DATE = re.compile(r'DATE', re.IGNORECASE)
+
+    # Single alternation for analyze_query_patterns: one scan through the
+    # SQL discovers every interesting token instead of six separate probes
+    _RE_TOKENS = re.compile(
+        r'(WHERE|DATE|SELECT\s*\*|LIMIT|GROUP\s+BY|COUNT\s*\(\s*DISTINCT)',
+        re.IGNORECASE
+    )
+    _RE_WS = re.compile(r'\s+')
+
     # Query patterns that should be cached longer
     CACHE_PATTERNS = {
         'dashboard': 3600,  # 1 hour
@@ -109,37 +229,39 @@ class QueryOptimizer:
         """Initialize query optimizer"""
         self.cache = QueryCache()
         self.optimization_rules = self._load_optimization_rules()
-        print("✅ Query Optimizer initialized")
+        logger.info("Query Optimizer initialized")
     
-    def _load_optimization_rules(self) -> List[Dict]:
+    @classmethod
+    def _load_optimization_rules(cls) -> List[Dict]:
         """Load query optimization rules"""
         return [
             {
                 'name': 'add_date_filter',
                 'pattern': 'WHERE',
-                'check': lambda q: 'WHERE' in q.upper() and 'DATE' not in q.upper(),
-                'action': self._add_date_filter,
+                'check': lambda q: cls._RE_WHERE.search(q) and not cls._RE_DATE.search(q),
+                'action': cls._add_date_filter,
                 'description': 'Add date filter to reduce data scanned'
             },
             {
                 'name': 'add_limit',
                 'pattern': 'SELECT',
-                'check': lambda q: 'SELECT' in q.upper() and 'LIMIT' not in q.upper() and 'GROUP BY' not in q.upper(),
-                'action': self._add_limit,
+                'check': lambda q: cls._RE_SELECT.search(q) and not cls._RE_LIMIT.search(q)
+                                   and not cls._RE_GROUP_BY.search(q),
+                'action': cls._add_limit,
                 'description': 'Add LIMIT to prevent scanning entire table'
             },
             {
                 'name': 'optimize_select_star',
                 'pattern': 'SELECT *',
-                'check': lambda q: 'SELECT *' in q.upper(),
-                'action': self._optimize_select_star,
+                'check': lambda q: cls._RE_SELECT_STAR.search(q) is not None,
+                'action': cls._optimize_select_star,
                 'description': 'Replace SELECT * with specific columns'
             },
             {
                 'name': 'use_approx_functions',
                 'pattern': 'COUNT(DISTINCT',
-                'check': lambda q: 'COUNT(DISTINCT' in q.upper(),
-                'action': self._use_approx_functions,
+                'check': lambda q: cls._RE_COUNT_DISTINCT.search(q) is not None,
+                'action': cls._use_approx_functions,
                 'description': 'Use APPROX functions for better performance'
             }
         ]
@@ -155,65 +277,63 @@ class QueryOptimizer:
         Returns:
             Tuple of (optimized_query, list of optimizations applied)
         """
-        optimized = query
-        optimizations_applied = []
-        
-        # Apply optimization rules
-        for rule in self.optimization_rules:
-            if rule['check'](optimized):
-                optimized = rule['action'](optimized)
-                optimizations_applied.append(rule['description'])
-        
-        # Add query hints
-        optimized = self._add_query_hints(optimized, query_type)
-        
+        # The rewrite itself is deterministic - dashboards re-issue the
+        # same SQL constantly, so repeat calls come out of the memo cache
+        optimized, optimizations_applied = _optimize_pure(query, query_type)
+        optimizations_applied = list(optimizations_applied)
+
         if optimizations_applied:
-            print(f"🔧 Applied {len(optimizations_applied)} optimizations:")
-            for opt in optimizations_applied:
-                print(f"   - {opt}")
+            logger.info("Applied %d optimizations: %s",
+                        len(optimizations_applied), '; '.join(optimizations_applied))
         
         return optimized, optimizations_applied
     
-    def _add_date_filter(self, query: str) -> str:
+    @staticmethod
+    def _add_date_filter(query: str) -> str:
         """Add date filter if missing"""
-        # Add 30-day filter by default
-        if 'WHERE' in query.upper():
-            # Insert after WHERE
-            return query.replace('WHERE', 
-                'WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY) AND')
-        else:
-            # Add WHERE clause
-            return query.replace('FROM', 
-                'FROM') + ' WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)'
+        # Add 30-day filter by default. Rewrite only the first WHERE
+        # keyword: the old blanket str.replace also hit 'WHERE' inside
+        # subqueries, CTEs and identifiers, emitting malformed SQL that
+        # still cost BigQuery a planning round trip before failing.
+        if QueryOptimizer._RE_WHERE.search(query):
+            return QueryOptimizer._RE_WHERE.sub(
+                'WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY) AND',
+                query, count=1)
+
+        # No WHERE clause - append one
+        return query + ' WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)'
     
-    def _add_limit(self, query: str) -> str:
+    @staticmethod
+    def _add_limit(query: str) -> str:
         """Add LIMIT clause if missing"""
-        if 'LIMIT' not in query.upper():
+        if not QueryOptimizer._RE_LIMIT.search(query):
             return query + ' LIMIT 10000'
         return query
     
-    def _optimize_select_star(self, query: str) -> str:
+    @staticmethod
+    def _optimize_select_star(query: str) -> str:
         """Suggest replacing SELECT * with specific columns"""
-        print("⚠️  Warning: SELECT * detected - consider specifying columns")
+        logger.warning("SELECT * detected - consider specifying columns")
         # In production, this would analyze the table schema and suggest columns
         return query
     
-    def _use_approx_functions(self, query: str) -> str:
+    @staticmethod
+    def _use_approx_functions(query: str) -> str:
         """Replace exact functions with approximate versions"""
-        # Replace COUNT(DISTINCT with APPROX_COUNT_DISTINCT
-        optimized = query.replace('COUNT(DISTINCT', 'APPROX_COUNT_DISTINCT(')
-        
-        # Fix the parentheses
-        optimized = optimized.replace('APPROX_COUNT_DISTINCT((', 'APPROX_COUNT_DISTINCT(')
-        
-        return optimized
+        # One regex pass handles every whitespace/case variant of
+        # COUNT ( DISTINCT ...; the old exact-string replace plus
+        # parenthesis fixup silently emitted broken SQL for variants,
+        # costing a billed planning round trip per rejected query
+        return QueryOptimizer._RE_COUNT_DISTINCT.sub(
+            'APPROX_COUNT_DISTINCT(', query)
     
-    def _add_query_hints(self, query: str, query_type: str) -> str:
+    @staticmethod
+    def _add_query_hints(query: str, query_type: str) -> str:
         """Add BigQuery query hints for optimization"""
         hints = []
-        
+
         # Add caching hint
-        cache_ttl = self.CACHE_PATTERNS.get(query_type, 3600)
+        cache_ttl = QueryOptimizer.CACHE_PATTERNS.get(query_type, 3600)
         hints.append(f"@cache_ttl={cache_ttl}")
         
         # Add other hints based on query type
@@ -288,16 +408,19 @@ class QueryOptimizer:
         optimized_query, optimizations = self.optimize_query(query, query_type)
         
         # Execute query
-        print(f"🔄 Executing query (type: {query_type})...")
+        logger.debug("Executing query (type: %s)", query_type)
         start_time = time.time()
-        
+
         result = executor_func(optimized_query)
-        
+
         execution_time = time.time() - start_time
-        print(f"✅ Query executed in {execution_time:.2f} seconds")
-        
-        # Cache result
-        cache_ttl = self.CACHE_PATTERNS.get(query_type, 3600)
+        logger.debug("Query executed in %.2f seconds", execution_time)
+
+        # Cache result; TTL adapts to how often this pattern actually
+        # refreshes, with CACHE_PATTERNS as the ceiling
+        self.cache.record_refresh(query_type)
+        cache_ttl = self.cache.adaptive_ttl(
+            query_type, self.CACHE_PATTERNS.get(query_type, 3600))
         self.cache.set(query, result, ttl=cache_ttl, params=params)
         
         return result
@@ -328,21 +451,27 @@ class QueryOptimizer:
         }
         
         for query in queries:
-            upper_query = query.upper()
-            
-            if 'WHERE' not in upper_query or 'DATE' not in upper_query:
+            # One scan per query; tokens are canonicalized by upping and
+            # stripping internal whitespace ('GROUP  BY' -> 'GROUPBY')
+            found = {
+                self._RE_WS.sub('', m.group(1).upper())
+                for m in self._RE_TOKENS.finditer(query)
+            }
+            has_where = 'WHERE' in found
+
+            if not has_where or 'DATE' not in found:
                 patterns['missing_date_filter'] += 1
-            
-            if 'SELECT *' in upper_query:
+
+            if 'SELECT*' in found:
                 patterns['select_star'] += 1
-            
-            if 'LIMIT' not in upper_query and 'GROUP BY' not in upper_query:
+
+            if 'LIMIT' not in found and 'GROUPBY' not in found:
                 patterns['missing_limit'] += 1
-            
-            if 'COUNT(DISTINCT' in upper_query:
+
+            if 'COUNT(DISTINCT' in found:
                 patterns['exact_distinct'] += 1
-            
-            if 'WHERE' not in upper_query:
+
+            if not has_where:
                 patterns['full_table_scan'] += 1
         
         analysis['patterns'] = patterns
@@ -392,7 +521,30 @@ class QueryOptimizer:
         return report
 
 
+@lru_cache(maxsize=1024)
+def _optimize_pure(query: str, query_type: str) -> Tuple[str, Tuple[str, ...]]:
+    """Deterministic core of optimize_query, memoized on its inputs
+
+    The rules are stateless, so identical (query, query_type) pairs -
+    the norm for dashboard SQL - resolve to a cached tuple instead of
+    re-running the rule checks and string rewrites.
+    """
+    optimized = query
+    applied = []
+
+    for rule in QueryOptimizer._load_optimization_rules():
+        if rule['check'](optimized):
+            optimized = rule['action'](optimized)
+            applied.append(rule['description'])
+
+    optimized = QueryOptimizer._add_query_hints(optimized, query_type)
+
+    return optimized, tuple(applied)
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+
     # Test query optimizer
     optimizer = QueryOptimizer()
     
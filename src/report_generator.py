@@ -3,12 +3,17 @@ Report Generator Module
 Creates and sends automated reports
 """
 
+import heapq
 import os
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from operator import itemgetter
+from functools import cached_property
 from typing import Dict, List, Any, Optional, Tuple
+import orjson
 import pandas as pd
-from jinja2 import Template
+from jinja2 import Environment
 import plotly.graph_objects as go
 import plotly.io as pio
 from dotenv import load_dotenv
@@ -21,24 +26,287 @@ from email_sender import EmailSender
 
 load_dotenv()
 
+# Percentage formatters as prebound methods - cheaper than evaluating a
+# fresh f-string per row in the format-heavy report sections
+_PCT1 = "{:.1f}%".format
+_PCT2 = "{:.2f}%".format
+_PCT1_SIGNED = "{:+.1f}%".format
+
+# Shared environment with autoescaping: GA4 page paths, channel names
+# and alert messages flow into the template from external data, so
+# markup characters in them must render inert
+_JINJA_ENV = Environment(autoescape=True)
+
+# Parsed and compiled once at import - template compilation is pure
+# CPU overhead and the template never changes between reports
+_DAILY_REPORT_TEMPLATE = _JINJA_ENV.from_string("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>VOTEGTR Daily Report - {{ report_date }}</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 900px;
+            margin: 0 auto;
+            padding: 20px;
+            background: #f5f5f5;
+        }
+        .header {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 30px;
+            border-radius: 10px;
+            margin-bottom: 30px;
+        }
+        .metric-card {
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            margin-bottom: 20px;
+        }
+        .metric-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 15px;
+            margin: 20px 0;
+        }
+        .metric-box {
+            background: #f8f9fa;
+            padding: 15px;
+            border-radius: 6px;
+            text-align: center;
+        }
+        .metric-value {
+            font-size: 2em;
+            font-weight: bold;
+            color: #667eea;
+        }
+        .metric-label {
+            font-size: 0.9em;
+            color: #666;
+            text-transform: uppercase;
+            letter-spacing: 1px;
+        }
+        .alert {
+            padding: 12px;
+            border-radius: 6px;
+            margin: 10px 0;
+        }
+        .alert-warning {
+            background: #fff3cd;
+            border-left: 4px solid #ffc107;
+        }
+        .alert-critical {
+            background: #f8d7da;
+            border-left: 4px solid #dc3545;
+        }
+        .alert-info {
+            background: #d1ecf1;
+            border-left: 4px solid #17a2b8;
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 15px 0;
+        }
+        th, td {
+            padding: 12px;
+            text-align: left;
+            border-bottom: 1px solid #ddd;
+        }
+        th {
+            background: #f8f9fa;
+            font-weight: 600;
+        }
+        .recommendation {
+            padding: 10px;
+            margin: 8px 0;
+            background: #e7f3ff;
+            border-left: 3px solid #2196F3;
+            border-radius: 4px;
+        }
+        .trend-up {
+            color: #28a745;
+        }
+        .trend-down {
+            color: #dc3545;
+        }
+        .footer {
+            text-align: center;
+            padding: 20px;
+            color: #666;
+            font-size: 0.9em;
+        }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📊 VOTEGTR Daily Analytics Report</h1>
+        <p>{{ report_date }} | Generated at {{ generated_at }}</p>
+    </div>
+    
+    <div class="metric-card">
+        <h2>📈 Executive Summary</h2>
+        <div class="metric-grid">
+            <div class="metric-box">
+                <div class="metric-value">{{ yesterday_sessions }}</div>
+                <div class="metric-label">Sessions</div>
+            </div>
+            <div class="metric-box">
+                <div class="metric-value">{{ yesterday_users }}</div>
+                <div class="metric-label">Users</div>
+            </div>
+            <div class="metric-box">
+                <div class="metric-value">{{ yesterday_conversions }}</div>
+                <div class="metric-label">Conversions</div>
+            </div>
+            <div class="metric-box">
+                <div class="metric-value">{{ bounce_rate }}</div>
+                <div class="metric-label">Bounce Rate</div>
+            </div>
+        </div>
+        <p><strong>7-Day Trend:</strong> <span class="{{ trend_class }}">{{ trend_indicator }}</span></p>
+    </div>
+    
+    <div class="metric-card">
+        <h2>🔄 Funnel Performance</h2>
+        <table>
+            <thead>
+                <tr>
+                    <th>Stage</th>
+                    <th>Count</th>
+                    <th>Conversion Rate</th>
+                    <th>Drop-off</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for stage in funnel_stages %}
+                <tr>
+                    <td>{{ stage.stage }}</td>
+                    <td>{{ stage.count }}</td>
+                    <td>{{ stage.conversion_rate }}</td>
+                    <td>{{ stage.dropoff_rate }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    </div>
+    
+    <div class="metric-card">
+        <h2>🎯 Attribution Analysis</h2>
+        <p><strong>UTM Coverage:</strong> {{ utm_coverage }}</p>
+        <table>
+            <thead>
+                <tr>
+                    <th>Channel</th>
+                    <th>Sessions</th>
+                    <th>Conversions</th>
+                    <th>Rate</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for channel in top_channels %}
+                <tr>
+                    <td>{{ channel.channel }}</td>
+                    <td>{{ channel.sessions }}</td>
+                    <td>{{ channel.conversions }}</td>
+                    <td>{{ channel.conversion_rate }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    </div>
+    
+    <div class="metric-card">
+        <h2>💰 Cost Analysis</h2>
+        <div class="metric-grid">
+            <div class="metric-box">
+                <div class="metric-value">{{ daily_cost }}</div>
+                <div class="metric-label">Today's Cost</div>
+            </div>
+            <div class="metric-box">
+                <div class="metric-value">{{ monthly_cost }}</div>
+                <div class="metric-label">Month to Date</div>
+            </div>
+            <div class="metric-box">
+                <div class="metric-value">{{ budget_status }}</div>
+                <div class="metric-label">Budget Status</div>
+            </div>
+        </div>
+    </div>
+    
+    {% if alerts %}
+    <div class="metric-card">
+        <h2>🚨 Alerts</h2>
+        {% for alert in alerts %}
+        <div class="alert alert-{{ alert.severity }}">
+            <strong>{{ alert.type|upper }}:</strong> {{ alert.message }}
+        </div>
+        {% endfor %}
+    </div>
+    {% endif %}
+    
+    <div class="metric-card">
+        <h2>💡 Recommendations</h2>
+        {% for rec in recommendations %}
+        <div class="recommendation">
+            {{ loop.index }}. {{ rec }}
+        </div>
+        {% endfor %}
+    </div>
+    
+    <div class="footer">
+        <p>VOTEGTR Analytics System | Report generated automatically</p>
+        <p>Questions? Check the dashboard for real-time data.</p>
+    </div>
+</body>
+</html>
+""")
+
 
 class ReportGenerator:
     """Generates various types of reports"""
     
     def __init__(self):
         """Initialize report generator"""
-        self.ga4 = GA4Client()
-        self.bq = OptimizedBigQueryManager()
-        self.cost_monitor = CostMonitor(self.bq)
-        self.optimizer = QueryOptimizer()
-        self.email_sender = EmailSender()
-        
         # Report templates directory
         self.reports_dir = 'reports'
         os.makedirs(self.reports_dir, exist_ok=True)
+
+        # One 14-day GA4 window shared by all sections of a report; the
+        # 1/7/14-day views are slices of it instead of separate API calls
+        self._daily_window = None
+        self._daily_window_lock = threading.Lock()
         
         print("✅ Report Generator initialized")
-    
+
+    # The API clients each do auth/network setup on construction, so
+    # they materialize on first use - rendering or saving an existing
+    # report never pays for GA4/BigQuery/SendGrid initialization
+    @cached_property
+    def ga4(self) -> GA4Client:
+        return GA4Client()
+
+    @cached_property
+    def bq(self) -> OptimizedBigQueryManager:
+        return OptimizedBigQueryManager()
+
+    @cached_property
+    def cost_monitor(self) -> CostMonitor:
+        return CostMonitor(self.bq)
+
+    @cached_property
+    def optimizer(self) -> QueryOptimizer:
+        return QueryOptimizer()
+
+    @cached_property
+    def email_sender(self) -> EmailSender:
+        return EmailSender()
+
     def generate_daily_report(self) -> Dict[str, Any]:
         """
         Generate comprehensive daily report
@@ -49,13 +317,19 @@ class ReportGenerator:
         print("\n📊 Generating Daily Report...")
         print("=" * 50)
         
-        report_date = datetime.now().date()
-        yesterday = (datetime.now() - timedelta(days=1)).date()
-        
+        # Fresh GA4 window for this report
+        self._daily_window = None
+
+        # One clock read for the whole report - three separate now()
+        # calls could straddle midnight and disagree on the date
+        now = datetime.now()
+        report_date = now.date()
+        yesterday = (now - timedelta(days=1)).date()
+
         report = {
             'metadata': {
                 'report_type': 'daily',
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': now.isoformat(),
                 'report_date': str(report_date),
                 'report_for': str(yesterday)
             },
@@ -68,47 +342,98 @@ class ReportGenerator:
             'recommendations': []
         }
         
-        # 1. Executive Summary
-        print("📈 Fetching executive summary...")
-        report['executive_summary'] = self._get_executive_summary()
-        
-        # 2. Performance Metrics
-        print("📊 Analyzing performance metrics...")
-        report['performance_metrics'] = self._get_performance_metrics()
-        
-        # 3. Funnel Analysis
-        print("🔄 Analyzing funnel...")
-        report['funnel_analysis'] = self._get_funnel_analysis()
-        
-        # 4. Attribution Analysis
-        print("🎯 Analyzing attribution...")
-        report['attribution'] = self._get_attribution_analysis()
-        
-        # 5. Cost Analysis
-        print("💰 Analyzing costs...")
-        report['cost_analysis'] = self.cost_monitor.generate_cost_report()
-        
+        # 1-5. Fetch the independent sections concurrently - each one
+        # blocks on GA4/BigQuery network I/O, so overlapping them brings
+        # wall-clock time down to roughly the slowest call
+        print("📈 Fetching report sections (parallel)...")
+        sections = {
+            'executive_summary': self._get_executive_summary,
+            'performance_metrics': self._get_performance_metrics,
+            'funnel_analysis': self._get_funnel_analysis,
+            'attribution': self._get_attribution_analysis,
+            'cost_analysis': self.cost_monitor.generate_cost_report,
+        }
+        failed_sections = []
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            futures = {name: executor.submit(fetch) for name, fetch in sections.items()}
+            for name, future in futures.items():
+                try:
+                    report[name] = future.result(timeout=120)
+                except Exception as e:
+                    # Keep the section's empty default so one failed API
+                    # call doesn't sink the whole report; the renderer
+                    # falls back to placeholders for missing sections
+                    failed_sections.append(name)
+                    print(f"⚠️  Failed to fetch {name}: {e}")
+
+        if failed_sections:
+            # Mark the report so a saved JSON isn't mistaken for a
+            # complete run
+            report['metadata']['degraded'] = True
+            report['metadata']['failed_sections'] = failed_sections
+
         # 6. Generate Alerts
         print("🚨 Checking for alerts...")
-        report['alerts'] = self._generate_alerts(report)
-        
+        try:
+            report['alerts'] = self._generate_alerts(report)
+        except (KeyError, TypeError) as e:
+            print(f"⚠️  Skipping alerts - report section missing: {e}")
+
+        if failed_sections:
+            # After alert generation so it can't be clobbered; shows up
+            # in the rendered HTML alongside the data alerts
+            report['alerts'].insert(0, {
+                'type': 'report_quality',
+                'severity': 'warning',
+                'message': f"Report degraded - sections failed: {', '.join(failed_sections)}"
+            })
+
         # 7. Generate Recommendations
         print("💡 Generating recommendations...")
-        report['recommendations'] = self._generate_recommendations(report)
-        
-        print("\n✅ Daily report generated successfully!")
-        
+        try:
+            report['recommendations'] = self._generate_recommendations(report)
+        except (KeyError, TypeError) as e:
+            print(f"⚠️  Skipping recommendations - report section missing: {e}")
+
+        if failed_sections:
+            print(f"\n⚠️  Daily report generated with failed sections: {', '.join(failed_sections)}")
+        else:
+            print("\n✅ Daily report generated successfully!")
+
         return report
     
+    def _fetch_daily_window(self) -> Dict[str, Any]:
+        """Fetch the shared 14-day window once per report"""
+        # Locked: summary and performance sections run on separate
+        # threads and must not both pay for the pull
+        with self._daily_window_lock:
+            if self._daily_window is None:
+                self._daily_window = self.ga4.get_daily_metrics(14)
+            return self._daily_window
+
+    def _daily_slice(self, days: int) -> Dict[str, Any]:
+        """Last-N-days view carved out of the shared 14-day window"""
+        window = self._fetch_daily_window()
+
+        # GA4 dates are YYYYMMDD strings, so the start-date cutoff is a
+        # lexicographic compare - same rows a DateRange(start..today)
+        # request would return
+        cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
+        rows = [d for d in window['daily_metrics'] if d['date'] >= cutoff]
+
+        return {
+            'daily_metrics': rows,
+            'totals': self.ga4._daily_totals(rows),
+            'period': f"Last {days} days"
+        }
+
     def _get_executive_summary(self) -> Dict[str, Any]:
         """Get executive summary metrics"""
-        
-        # Get yesterday's metrics
-        metrics = self.ga4.get_daily_metrics(1)
-        
-        # Get week-over-week comparison
-        last_week = self.ga4.get_daily_metrics(7)
-        prev_week = self.ga4.get_daily_metrics(14)
+
+        # All three views come out of the one cached 14-day pull
+        metrics = self._daily_slice(1)
+        last_week = self._daily_slice(7)
+        prev_week = self._fetch_daily_window()
         
         if metrics['daily_metrics']:
             yesterday = metrics['daily_metrics'][0]
@@ -128,16 +453,19 @@ class ReportGenerator:
                 'sessions': yesterday.get('sessions', 0),
                 'page_views': yesterday.get('page_views', 0),
                 'conversions': yesterday.get('conversions', 0),
-                'bounce_rate': f"{yesterday.get('bounce_rate', 0):.1f}%"
+                'bounce_rate': _PCT1(yesterday.get('bounce_rate', 0)),
+                # Raw value for downstream comparisons - no parsing the
+                # formatted string back into a float
+                'bounce_rate_pct': yesterday.get('bounce_rate', 0)
             },
             'last_7_days': {
                 'total_users': last_week['totals']['total_users'],
                 'total_sessions': last_week['totals']['total_sessions'],
                 'total_conversions': last_week['totals']['total_conversions'],
-                'avg_bounce_rate': f"{last_week['totals']['avg_bounce_rate']:.1f}%"
+                'avg_bounce_rate': _PCT1(last_week['totals']['avg_bounce_rate'])
             },
             'trends': {
-                'sessions_wow': f"{wow_sessions:+.1f}%",
+                'sessions_wow': _PCT1_SIGNED(wow_sessions),
                 'status': 'growing' if wow_sessions > 0 else 'declining'
             }
         }
@@ -145,8 +473,8 @@ class ReportGenerator:
     def _get_performance_metrics(self) -> Dict[str, Any]:
         """Get detailed performance metrics"""
         
-        # Get daily trend
-        daily_data = self.ga4.get_daily_metrics(7)
+        # Get daily trend from the shared window
+        daily_data = self._daily_slice(7)
         
         # Get top pages
         top_pages = self.ga4.get_top_pages(limit=5)
@@ -179,16 +507,23 @@ class ReportGenerator:
 
         funnel = self.ga4.get_funnel_metrics()
 
-        # Format funnel stages (user journey)
+        # Format funnel stages (user journey), tracking the worst
+        # drop-off inline - one pass, compared on the raw floats
         stages_formatted = []
+        biggest_dropoff = "N/A"
+        worst_dropoff_rate = float('-inf')
         for stage in funnel.get('funnel_stages', []):
+            drop_off_rate = stage.get('drop_off_rate', 0)
+            if drop_off_rate > worst_dropoff_rate:
+                worst_dropoff_rate = drop_off_rate
+                biggest_dropoff = stage['stage']
             stages_formatted.append({
                 'stage': stage['stage'],
                 'event': stage['event'],
                 'count': stage['count'],
                 'users': stage['users'],
-                'progression_rate': f"{stage.get('progression_rate', 100):.1f}%",
-                'drop_off_rate': f"{stage.get('drop_off_rate', 0):.1f}%"
+                'progression_rate': _PCT1(stage.get('progression_rate', 100)),
+                'drop_off_rate': _PCT1(drop_off_rate)
             })
 
         # Format conversions
@@ -202,17 +537,11 @@ class ReportGenerator:
                 'users': conv['users']
             })
 
-        # Find biggest drop-off
-        biggest_dropoff = "N/A"
-        if stages_formatted:
-            max_dropoff_stage = max(stages_formatted, key=lambda x: float(x['drop_off_rate'].rstrip('%')))
-            biggest_dropoff = max_dropoff_stage['stage']
-
         return {
             'stages': stages_formatted,
             'conversions': {
                 'total': conversions_data.get('total', 0),
-                'conversion_rate': f"{conversions_data.get('conversion_rate', 0):.2f}%",
+                'conversion_rate': _PCT2(conversions_data.get('conversion_rate', 0)),
                 'events': conversions_formatted
             },
             'biggest_dropoff': biggest_dropoff,
@@ -224,12 +553,9 @@ class ReportGenerator:
         
         attribution = self.ga4.get_attribution_data()
         
-        # Get top channels
-        top_channels = sorted(
-            attribution['channels'],
-            key=lambda x: x['sessions'],
-            reverse=True
-        )[:5]
+        # Top 5 via a bounded heap - no full sort of the channel list
+        top_channels = heapq.nlargest(
+            5, attribution['channels'], key=itemgetter('sessions'))
         
         # Calculate channel efficiency
         for channel in top_channels:
@@ -241,14 +567,15 @@ class ReportGenerator:
         best_channel = max(top_channels, key=lambda x: x['efficiency']) if top_channels else None
         
         return {
-            'utm_coverage': f"{attribution['utm_coverage']:.1f}%",
+            'utm_coverage': _PCT1(attribution['utm_coverage']),
+            'utm_coverage_pct': attribution['utm_coverage'],
             'total_conversions': attribution['total_conversions'],
             'top_channels': [
                 {
                     'channel': ch['channel'],
                     'sessions': ch['sessions'],
                     'conversions': ch['conversions'],
-                    'conversion_rate': f"{ch['conversion_rate']:.2f}%"
+                    'conversion_rate': _PCT2(ch['conversion_rate'])
                 }
                 for ch in top_channels
             ],
@@ -270,7 +597,7 @@ class ReportGenerator:
                 })
         
         # Check bounce rate
-        bounce_rate = float(report['executive_summary']['yesterday']['bounce_rate'].rstrip('%'))
+        bounce_rate = report['executive_summary']['yesterday']['bounce_rate_pct']
         if bounce_rate > 70:
             alerts.append({
                 'type': 'bounce_rate',
@@ -279,7 +606,7 @@ class ReportGenerator:
             })
         
         # Check UTM coverage
-        utm_coverage = float(report['attribution']['utm_coverage'].rstrip('%'))
+        utm_coverage = report['attribution']['utm_coverage_pct']
         if utm_coverage < 75:
             alerts.append({
                 'type': 'attribution',
@@ -308,7 +635,7 @@ class ReportGenerator:
             recommendations.append(f"Focus on improving '{worst_dropoff}' stage - highest drop-off rate")
         
         # Based on attribution
-        utm_coverage = float(report['attribution']['utm_coverage'].rstrip('%'))
+        utm_coverage = report['attribution']['utm_coverage_pct']
         if utm_coverage < 75:
             recommendations.append("Add UTM parameters to all marketing links to improve attribution")
         
@@ -337,313 +664,155 @@ class ReportGenerator:
         Returns:
             HTML string
         """
-        html_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>VOTEGTR Daily Report - {{ report_date }}</title>
-            <style>
-                body {
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 900px;
-                    margin: 0 auto;
-                    padding: 20px;
-                    background: #f5f5f5;
-                }
-                .header {
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 30px;
-                    border-radius: 10px;
-                    margin-bottom: 30px;
-                }
-                .metric-card {
-                    background: white;
-                    padding: 20px;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    margin-bottom: 20px;
-                }
-                .metric-grid {
-                    display: grid;
-                    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                    gap: 15px;
-                    margin: 20px 0;
-                }
-                .metric-box {
-                    background: #f8f9fa;
-                    padding: 15px;
-                    border-radius: 6px;
-                    text-align: center;
-                }
-                .metric-value {
-                    font-size: 2em;
-                    font-weight: bold;
-                    color: #667eea;
-                }
-                .metric-label {
-                    font-size: 0.9em;
-                    color: #666;
-                    text-transform: uppercase;
-                    letter-spacing: 1px;
-                }
-                .alert {
-                    padding: 12px;
-                    border-radius: 6px;
-                    margin: 10px 0;
-                }
-                .alert-warning {
-                    background: #fff3cd;
-                    border-left: 4px solid #ffc107;
-                }
-                .alert-critical {
-                    background: #f8d7da;
-                    border-left: 4px solid #dc3545;
-                }
-                .alert-info {
-                    background: #d1ecf1;
-                    border-left: 4px solid #17a2b8;
-                }
-                table {
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin: 15px 0;
-                }
-                th, td {
-                    padding: 12px;
-                    text-align: left;
-                    border-bottom: 1px solid #ddd;
-                }
-                th {
-                    background: #f8f9fa;
-                    font-weight: 600;
-                }
-                .recommendation {
-                    padding: 10px;
-                    margin: 8px 0;
-                    background: #e7f3ff;
-                    border-left: 3px solid #2196F3;
-                    border-radius: 4px;
-                }
-                .trend-up {
-                    color: #28a745;
-                }
-                .trend-down {
-                    color: #dc3545;
-                }
-                .footer {
-                    text-align: center;
-                    padding: 20px;
-                    color: #666;
-                    font-size: 0.9em;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>📊 VOTEGTR Daily Analytics Report</h1>
-                <p>{{ report_date }} | Generated at {{ generated_at }}</p>
-            </div>
-            
-            <div class="metric-card">
-                <h2>📈 Executive Summary</h2>
-                <div class="metric-grid">
-                    <div class="metric-box">
-                        <div class="metric-value">{{ yesterday_sessions }}</div>
-                        <div class="metric-label">Sessions</div>
-                    </div>
-                    <div class="metric-box">
-                        <div class="metric-value">{{ yesterday_users }}</div>
-                        <div class="metric-label">Users</div>
-                    </div>
-                    <div class="metric-box">
-                        <div class="metric-value">{{ yesterday_conversions }}</div>
-                        <div class="metric-label">Conversions</div>
-                    </div>
-                    <div class="metric-box">
-                        <div class="metric-value">{{ bounce_rate }}</div>
-                        <div class="metric-label">Bounce Rate</div>
-                    </div>
-                </div>
-                <p><strong>7-Day Trend:</strong> <span class="{{ trend_class }}">{{ trend_indicator }}</span></p>
-            </div>
-            
-            <div class="metric-card">
-                <h2>🔄 Funnel Performance</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Stage</th>
-                            <th>Count</th>
-                            <th>Conversion Rate</th>
-                            <th>Drop-off</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {% for stage in funnel_stages %}
-                        <tr>
-                            <td>{{ stage.stage }}</td>
-                            <td>{{ stage.count }}</td>
-                            <td>{{ stage.conversion_rate }}</td>
-                            <td>{{ stage.dropoff_rate }}</td>
-                        </tr>
-                        {% endfor %}
-                    </tbody>
-                </table>
-            </div>
-            
-            <div class="metric-card">
-                <h2>🎯 Attribution Analysis</h2>
-                <p><strong>UTM Coverage:</strong> {{ utm_coverage }}</p>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Channel</th>
-                            <th>Sessions</th>
-                            <th>Conversions</th>
-                            <th>Rate</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {% for channel in top_channels %}
-                        <tr>
-                            <td>{{ channel.channel }}</td>
-                            <td>{{ channel.sessions }}</td>
-                            <td>{{ channel.conversions }}</td>
-                            <td>{{ channel.conversion_rate }}</td>
-                        </tr>
-                        {% endfor %}
-                    </tbody>
-                </table>
-            </div>
-            
-            <div class="metric-card">
-                <h2>💰 Cost Analysis</h2>
-                <div class="metric-grid">
-                    <div class="metric-box">
-                        <div class="metric-value">{{ daily_cost }}</div>
-                        <div class="metric-label">Today's Cost</div>
-                    </div>
-                    <div class="metric-box">
-                        <div class="metric-value">{{ monthly_cost }}</div>
-                        <div class="metric-label">Month to Date</div>
-                    </div>
-                    <div class="metric-box">
-                        <div class="metric-value">{{ budget_status }}</div>
-                        <div class="metric-label">Budget Status</div>
-                    </div>
-                </div>
-            </div>
-            
-            {% if alerts %}
-            <div class="metric-card">
-                <h2>🚨 Alerts</h2>
-                {% for alert in alerts %}
-                <div class="alert alert-{{ alert.severity }}">
-                    <strong>{{ alert.type|upper }}:</strong> {{ alert.message }}
-                </div>
-                {% endfor %}
-            </div>
-            {% endif %}
-            
-            <div class="metric-card">
-                <h2>💡 Recommendations</h2>
-                {% for rec in recommendations %}
-                <div class="recommendation">
-                    {{ loop.index }}. {{ rec }}
-                </div>
-                {% endfor %}
-            </div>
-            
-            <div class="footer">
-                <p>VOTEGTR Analytics System | Report generated automatically</p>
-                <p>Questions? Check the dashboard for real-time data.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
+        # Sections that failed to fetch are empty dicts (see
+        # generate_daily_report), so every lookup goes through a default:
+        # a degraded report renders with placeholders and its
+        # report_quality alert instead of raising KeyError after all the
+        # other sections succeeded
+        exec_summary = report_data.get('executive_summary') or {}
+        yesterday = exec_summary.get('yesterday') or {}
+        trends = exec_summary.get('trends') or {}
+        funnel = report_data.get('funnel_analysis') or {}
+        attribution = report_data.get('attribution') or {}
+        cost = report_data.get('cost_analysis') or {}
+        usage = cost.get('current_usage') or {}
+
         # Prepare template data
         template_data = {
             'report_date': report_data['metadata']['report_for'],
-            'generated_at': datetime.now().strftime('%I:%M %p'),
-            'yesterday_sessions': report_data['executive_summary']['yesterday']['sessions'],
-            'yesterday_users': report_data['executive_summary']['yesterday']['users'],
-            'yesterday_conversions': report_data['executive_summary']['yesterday']['conversions'],
-            'bounce_rate': report_data['executive_summary']['yesterday']['bounce_rate'],
-            'trend_indicator': report_data['executive_summary']['trends']['sessions_wow'],
-            'trend_class': 'trend-up' if report_data['executive_summary']['trends']['status'] == 'growing' else 'trend-down',
-            'funnel_stages': report_data['funnel_analysis']['stages'][:5],
-            'utm_coverage': report_data['attribution']['utm_coverage'],
-            'top_channels': report_data['attribution']['top_channels'],
-            'daily_cost': report_data['cost_analysis']['current_usage']['today']['cost'],
-            'monthly_cost': report_data['cost_analysis']['current_usage']['month']['cost'],
-            'budget_status': report_data['cost_analysis']['summary']['status'].upper(),
-            'alerts': report_data['alerts'],
-            'recommendations': report_data['recommendations']
+            # Display the timestamp the report was generated with, not a
+            # fresh clock read at render time
+            'generated_at': datetime.fromisoformat(
+                report_data['metadata']['generated_at']).strftime('%I:%M %p'),
+            'yesterday_sessions': yesterday.get('sessions', 0),
+            'yesterday_users': yesterday.get('users', 0),
+            'yesterday_conversions': yesterday.get('conversions', 0),
+            'bounce_rate': yesterday.get('bounce_rate', 'N/A'),
+            'trend_indicator': trends.get('sessions_wow', 'N/A'),
+            'trend_class': 'trend-up' if trends.get('status') == 'growing' else 'trend-down',
+            'funnel_stages': (funnel.get('stages') or [])[:5],
+            'utm_coverage': attribution.get('utm_coverage', 'N/A'),
+            'top_channels': attribution.get('top_channels', []),
+            'daily_cost': (usage.get('today') or {}).get('cost', 'N/A'),
+            'monthly_cost': (usage.get('month') or {}).get('cost', 'N/A'),
+            'budget_status': (cost.get('summary') or {}).get('status', 'unknown').upper(),
+            'alerts': report_data.get('alerts', []),
+            'recommendations': report_data.get('recommendations', [])
         }
         
-        # Render template
-        template = Template(html_template)
-        html = template.render(**template_data)
-        
-        return html
+        # Render with the precompiled module-level template
+        return _DAILY_REPORT_TEMPLATE.render(**template_data)
     
-    def save_report(self, report_data: Dict, format: str = 'json') -> str:
+    def save_report(self, report_data: Dict, format: str = 'json',
+                    rendered_html: Optional[str] = None) -> str:
         """
         Save report to file
-        
+
         Args:
             report_data: Report data
             format: Output format (json, html)
-            
+            rendered_html: Already-rendered HTML to write as-is, sparing
+                a second template render
+
         Returns:
             File path
         """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
+
         if format == 'json':
             filename = f"{self.reports_dir}/daily_report_{timestamp}.json"
-            with open(filename, 'w') as f:
-                json.dump(report_data, f, indent=2, default=str)
-        
+            # orjson serializes the nested dicts in C and hands back the
+            # finished bytes; default=str still covers stray date objects
+            self._write_report_file(filename, orjson.dumps(
+                report_data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                default=str
+            ))
+            self._append_history_row(report_data)
+
         elif format == 'html':
             filename = f"{self.reports_dir}/daily_report_{timestamp}.html"
-            html = self.create_html_report(report_data)
-            with open(filename, 'w') as f:
-                f.write(html)
-        
+            html = rendered_html if rendered_html is not None else self.create_html_report(report_data)
+            self._write_report_file(filename, html.encode('utf-8'))
+
         print(f"📁 Report saved: {filename}")
         return filename
+
+    def _append_history_row(self, report_data: Dict):
+        """Append a flat summary row to reports/history.jsonl"""
+        # Historical scans shouldn't have to open and parse every pretty-
+        # printed report file; one compact orjson line per run gives an
+        # append-only series that loads straight into pandas
+        # (pd.read_json(..., lines=True)). The per-report JSON stays as
+        # the human-readable copy.
+        meta = report_data.get('metadata', {})
+        yesterday = report_data.get('executive_summary', {}).get('yesterday', {})
+        row = {
+            'report_for': meta.get('report_for'),
+            'generated_at': meta.get('generated_at'),
+            'sessions': yesterday.get('sessions'),
+            'users': yesterday.get('users'),
+            'conversions': yesterday.get('conversions'),
+            'bounce_rate_pct': yesterday.get('bounce_rate_pct'),
+            'utm_coverage_pct': report_data.get('attribution', {}).get('utm_coverage_pct'),
+        }
+        try:
+            with open(f"{self.reports_dir}/history.jsonl", 'ab') as f:
+                f.write(orjson.dumps(row, default=str) + b'\n')
+        except OSError as e:
+            # History is a convenience series; never fail the report for it
+            print(f"⚠️  Could not append history row: {e}")
+
+    def _write_report_file(self, filename: str, data: bytes):
+        """Write report bytes to a temp name and rename into place"""
+        # reports/ is scanned by other tooling (test_github_actions.py,
+        # GitHub Actions retries); fsync + os.replace means a scanner
+        # only ever sees complete files
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, filename)
     
-    def generate_and_save_daily_report(self, send_email: bool = False) -> Tuple[str, str]:
+    def generate_and_save_daily_report(self, send_email: bool = False,
+                                       save_json: bool = True,
+                                       save_html: bool = True) -> Tuple[Optional[str], Optional[str]]:
         """
         Generate and save daily report in multiple formats
-        
+
         Args:
             send_email: Whether to send the report via email
-            
+            save_json: Write the JSON report to reports/
+            save_html: Write the HTML report to reports/
+
         Returns:
-            Tuple of (json_path, html_path)
+            Tuple of (json_path, html_path); None for skipped formats
         """
         # Generate report
         report = self.generate_daily_report()
-        
-        # Save in both formats
-        json_path = self.save_report(report, 'json')
-        html_path = self.save_report(report, 'html')
-        
-        # Send email if requested
-        if send_email and self.email_sender.enabled:
+
+        # The template render is the priciest non-network step, so it
+        # only runs when something consumes the HTML - the saved file or
+        # the email body - and that one render covers both
+        html_content = None
+        if save_html or (send_email and self.email_sender.enabled):
             html_content = self.create_html_report(report)
-            success = self.email_sender.send_daily_report(html_content, json_path)
+
+        json_path = self.save_report(report, 'json') if save_json else None
+        html_path = (self.save_report(report, 'html', rendered_html=html_content)
+                     if save_html else None)
+
+        # Send email if requested; the attachment is serialized from the
+        # in-memory report, so it's present even when no JSON was saved
+        if send_email and self.email_sender.enabled:
+            success = self.email_sender.send_daily_report(
+                html_content, json_path, json_data=report)
             if not success:
                 print("⚠️  Failed to send email report")
         elif send_email and not self.email_sender.enabled:
             print("📧 Email sending requested but SendGrid not configured")
-        
+
         return json_path, html_path
 
 
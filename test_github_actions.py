@@ -5,15 +5,23 @@ Test script to verify GitHub Actions setup
 
 import os
 import json
+import re
 from datetime import datetime, timedelta
-import pytz
+from zoneinfo import ZoneInfo
+
+# Report filenames look like daily_report_20250817_125301.json; matching
+# with one compiled pattern both validates the name and captures the
+# timestamp fields, replacing positional split() indexing
+_REPORT_TS_RE = re.compile(r'daily_report_(\d{8})_(\d{6})\.json$')
+
+# Shared tz object - zoneinfo loads the tzdata once and naive datetimes
+# attach it with a plain replace(), no pytz localize() allocation
+_NY_TZ = ZoneInfo('America/New_York')
 
 def check_github_actions_status():
     """Check if GitHub Actions ran today at 7AM"""
     
-    # Get New York timezone
-    ny_tz = pytz.timezone('America/New_York')
-    now = datetime.now(ny_tz)
+    now = datetime.now(_NY_TZ)
     
     # Calculate when 7AM ET was today
     seven_am_today = now.replace(hour=7, minute=0, second=0, microsecond=0)
@@ -27,31 +35,36 @@ def check_github_actions_status():
     # Check for reports generated around 7AM
     reports_dir = "reports"
     if os.path.exists(reports_dir):
-        files = sorted([f for f in os.listdir(reports_dir) if f.endswith('.json')])
-        
-        if files:
-            latest_report = files[-1]
-            # Extract timestamp from filename (e.g., daily_report_20250817_125301.json)
-            parts = latest_report.split('_')
-            if len(parts) >= 4:
-                date_str = parts[2]
-                time_str = parts[3].replace('.json', '')
-                
-                # Parse the timestamp
-                report_time = datetime.strptime(f"{date_str}{time_str}", "%Y%m%d%H%M%S")
-                report_time = ny_tz.localize(report_time)
-                
-                time_diff = abs((report_time - seven_am_today).total_seconds() / 60)
-                
-                print(f"📁 Latest report: {latest_report}")
-                print(f"⏰ Generated at: {report_time.strftime('%Y-%m-%d %I:%M %p')}")
-                print()
-                
-                if time_diff < 30:  # Within 30 minutes of 7AM
-                    print("✅ GitHub Actions appears to have run successfully at 7AM!")
-                else:
-                    print("⚠️  No report found from 7AM today")
-                    print(f"   Time difference: {time_diff:.0f} minutes")
+        # Only the newest report matters - a running max over scandir
+        # skips building and sorting the whole listing; the names embed
+        # YYYYMMDD_HHMMSS timestamps, so lexicographic max is newest
+        latest_report = None
+        latest_match = None
+        with os.scandir(reports_dir) as entries:
+            for entry in entries:
+                match = _REPORT_TS_RE.match(entry.name)
+                if match and (latest_report is None or entry.name > latest_report):
+                    latest_report = entry.name
+                    latest_match = match
+
+        if latest_match:
+            date_str, time_str = latest_match.group(1), latest_match.group(2)
+
+            # Parse the timestamp
+            report_time = datetime.strptime(f"{date_str}{time_str}", "%Y%m%d%H%M%S")
+            report_time = report_time.replace(tzinfo=_NY_TZ)
+
+            time_diff = abs((report_time - seven_am_today).total_seconds() / 60)
+
+            print(f"📁 Latest report: {latest_report}")
+            print(f"⏰ Generated at: {report_time.strftime('%Y-%m-%d %I:%M %p')}")
+            print()
+
+            if time_diff < 30:  # Within 30 minutes of 7AM
+                print("✅ GitHub Actions appears to have run successfully at 7AM!")
+            else:
+                print("⚠️  No report found from 7AM today")
+                print(f"   Time difference: {time_diff:.0f} minutes")
     
     # Check configuration
     print("\n📋 Configuration Status:")